@@ -0,0 +1,338 @@
+"""
+Rate-limited, resumable broadcasts.
+
+`Broadcast` sends one message to many chats with a bounded pool of worker
+tasks under a `ChatRateLimiter` (global and per-chat token buckets):
+
+- the text is split (markup-aware, see `send_long`) once and the chunks are
+  reused for every recipient,
+- flood waits (`TelegramRetryAfter`) pause the limiter and are retried,
+- chats that blocked the bot (`TelegramForbiddenError`) are recorded and
+  skipped,
+- every recipient's outcome is checkpointed to a SQLite file, so running
+  a broadcast again with the same `job_id` after a crash only sends to
+  chats still pending,
+- `progress(BroadcastStats)` is called periodically with counts,
+  throughput and ETA.
+
+Example:
+    broadcast = Broadcast(
+        bot, announcement, checkpoint="broadcasts.sqlite", job_id="spring-sale", progress=print
+    )
+    stats = await broadcast.run(chat_ids)
+
+Resuming is explicit: without a `job_id` every `Broadcast` is a new job,
+so sending the same content again later reaches every chat again.
+
+Only `bot.send_message` is used, so the engine can be exercised against a
+local fake Bot API, e.g. with
+`Bot(token, session=AiohttpSession(api=TelegramAPIServer.from_base(url)))`,
+or with any object providing that method.
+
+Delivery is at least once: chats in flight (or whose outcome was not yet
+checkpointed) when the process died receive the message again on resume.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from aiogram import Bot
+from aiogram.enums.parse_mode import ParseMode
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError, TelegramRetryAfter
+
+from .argument_shortcuts import PM
+from .logger import logger
+from .md.applier import try_with_md
+from .md.format.entities import Fragment
+from .rate_limit import ChatRateLimiter
+from .send_long import _split, default_limiter
+
+# recipient statuses in the checkpoint
+PENDING = 0
+SENT = 1
+BLOCKED = 2
+FAILED = 3
+
+
+@dataclass(slots=True)
+class BroadcastStats:
+    """Live progress of a broadcast."""
+
+    total: int = 0
+    resumed: int = 0  # recipients finished by an earlier run
+    sent: int = 0
+    blocked: int = 0
+    failed: int = 0
+    flood_waits: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def done(self) -> int:
+        return self.resumed + self.sent + self.blocked + self.failed
+
+    @property
+    def rate(self) -> float:
+        """Recipients per second in this run."""
+        elapsed = time.monotonic() - self.started
+        return (self.done - self.resumed) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        """Estimated seconds left; None until the rate is known."""
+        rate = self.rate
+        return (self.total - self.done) / rate if rate > 0 else None
+
+    def __str__(self) -> str:
+        eta = "?" if self.eta is None else f"{self.eta:.0f}s"
+        return (
+            f"{self.done}/{self.total} ({self.sent} sent, {self.blocked} blocked, "
+            f"{self.failed} failed) {self.rate:.1f}/s, ETA {eta}"
+        )
+
+
+class _Checkpoint:
+    """
+    Recipient statuses of broadcast jobs in a SQLite file.
+
+    The calls block, so `Broadcast` runs them in worker threads; a lock
+    keeps them from overlapping on the shared connection.
+    """
+
+    def __init__(self, path: str, job_id: str) -> None:
+        self.job_id = job_id
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        # chat_id has no type: ints and usernames are stored as given
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS broadcast_recipients ("
+            " job TEXT NOT NULL, chat_id NOT NULL, status INTEGER NOT NULL DEFAULT 0, error TEXT,"
+            " PRIMARY KEY (job, chat_id))"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS broadcast_recipients_status ON broadcast_recipients (job, status)"
+        )
+        self.db.commit()
+
+    def add(self, chats: Iterable[int | str], batch: int = 10_000) -> None:
+        sql = "INSERT OR IGNORE INTO broadcast_recipients (job, chat_id) VALUES (?, ?)"
+        rows: List[Tuple[str, int | str]] = []
+        with self._lock:
+            for chat_id in chats:
+                rows.append((self.job_id, chat_id))
+                if len(rows) >= batch:
+                    self.db.executemany(sql, rows)
+                    rows.clear()
+            if rows:
+                self.db.executemany(sql, rows)
+            self.db.commit()
+
+    def counts(self) -> Dict[int, int]:
+        with self._lock:
+            cursor = self.db.execute(
+                "SELECT status, count(*) FROM broadcast_recipients WHERE job = ? GROUP BY status",
+                (self.job_id,),
+            )
+            return dict(cursor.fetchall())
+
+    def pending(self, after: int, limit: int) -> List[Tuple[int, int | str]]:
+        with self._lock:
+            cursor = self.db.execute(
+                "SELECT rowid, chat_id FROM broadcast_recipients"
+                " WHERE job = ? AND status = 0 AND rowid > ? ORDER BY rowid LIMIT ?",
+                (self.job_id, after, limit),
+            )
+            return cursor.fetchall()
+
+    def record(self, results: List[Tuple[int, str | None, int | str]]) -> None:
+        with self._lock:
+            self.db.executemany(
+                "UPDATE broadcast_recipients SET status = ?, error = ? WHERE job = ? AND chat_id = ?",
+                [(status, error, self.job_id, chat_id) for status, error, chat_id in results],
+            )
+            self.db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self.db.close()
+
+
+class Broadcast:
+    """Send one message to many chats, resumably and within flood limits."""
+
+    def __init__(
+        self,
+        bot: Bot,
+        text: str | Fragment,
+        *,
+        parse_mode: ParseMode | None = PM,
+        max_len: int = 4096,
+        reply_markup: Any = None,
+        checkpoint: str = "broadcast.sqlite",
+        job_id: str | None = None,
+        limiter: ChatRateLimiter | None = None,
+        workers: int = 20,
+        max_retries: int = 5,
+        progress: Callable[[BroadcastStats], Any] | None = None,
+        progress_interval: float = 5.0,
+        **params: Any,
+    ) -> None:
+        """
+        Args:
+            bot: Bot instance (or anything with a compatible `send_message`).
+            text: Message text, possibly longer than `max_len`.
+            parse_mode: Markup of `text`; None sends plain text.
+            max_len: Maximum chunk length (Telegram limit: 4096).
+            reply_markup: Attached to the last chunk only.
+            checkpoint: Path of the SQLite progress file.
+            job_id: Identifies the broadcast in the checkpoint; pass the
+                same id to resume it after a crash. By default each
+                instance gets a new id, so nothing is resumed or skipped.
+            limiter: Rate limiter; defaults to the one `send_long()` uses,
+                so both stay within the bot's global limit together.
+            workers: Recipients processed concurrently.
+            max_retries: Flood waits to sit out per chunk before giving up
+                on a recipient.
+            progress: Called with the `BroadcastStats` every
+                `progress_interval` seconds and at the end; may be a
+                coroutine function.
+            **params: Extra `send_message` arguments.
+        """
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+
+        self.bot = bot
+        self.contents, self.parse_mode = _split(text, parse_mode, max_len)
+        if reply_markup is not None and self.contents:
+            self.contents[-1] = {**self.contents[-1], "reply_markup": reply_markup}
+        self.params = params
+        self.checkpoint = checkpoint
+        self.job_id = job_id or self._default_job_id()
+        self.limiter = limiter or default_limiter
+        self.workers = workers
+        self.max_retries = max_retries
+        self.progress = progress
+        self.progress_interval = progress_interval
+
+        self.stats = BroadcastStats()
+        self._results: List[Tuple[int, str | None, int | str]] = []
+
+    def _default_job_id(self) -> str:
+        raw = repr((self.contents, str(self.parse_mode), sorted(self.params.items()))).encode()
+        # a per-instance nonce: identical content sent later is a new job
+        return f"{hashlib.blake2b(raw, digest_size=8).hexdigest()}-{secrets.token_hex(4)}"
+
+    async def run(self, chats: Iterable[int | str] = ()) -> BroadcastStats:
+        """
+        Send to `chats`, skipping those the checkpoint already has an outcome for.
+
+        Chats may be omitted when resuming (same `job_id`); the checkpoint
+        remembers the recipients of the job.
+
+        Returns:
+            Final statistics (also kept in `self.stats`).
+        """
+        # checkpoint I/O runs in threads: bulk inserts must not stall the loop
+        checkpoint = await asyncio.to_thread(_Checkpoint, self.checkpoint, self.job_id)
+        try:
+            await asyncio.to_thread(checkpoint.add, chats)
+            counts = await asyncio.to_thread(checkpoint.counts)
+            total = sum(counts.values())
+            self.stats = BroadcastStats(total=total, resumed=total - counts.get(PENDING, 0))
+            if self.stats.resumed:
+                logger.info("Resuming broadcast %s: %s", self.job_id, self.stats)
+
+            queue: asyncio.Queue = asyncio.Queue(self.workers * 2)
+            workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.workers)]
+            reporter = asyncio.create_task(self._report_loop(checkpoint))
+            try:
+                await self._produce(checkpoint, queue)
+                await asyncio.gather(*workers)
+            finally:
+                for task in (*workers, reporter):
+                    task.cancel()
+                await asyncio.gather(*workers, reporter, return_exceptions=True)
+                await self._flush(checkpoint)
+                await self._report()
+        finally:
+            await asyncio.to_thread(checkpoint.close)
+        return self.stats
+
+    async def _produce(self, checkpoint: _Checkpoint, queue: asyncio.Queue) -> None:
+        # keyset pages: outcomes are written while we read
+        after = 0
+        while rows := await asyncio.to_thread(checkpoint.pending, after, 1000):
+            for after, chat_id in rows:
+                await queue.put(chat_id)
+        for _ in range(self.workers):
+            await queue.put(None)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while (chat_id := await queue.get()) is not None:
+            status, error = await self._deliver(chat_id)
+            if status == SENT:
+                self.stats.sent += 1
+            elif status == BLOCKED:
+                self.stats.blocked += 1
+            else:
+                self.stats.failed += 1
+            self._results.append((status, error, chat_id))
+
+    async def _deliver(self, chat_id: int | str) -> Tuple[int, str | None]:
+        for content in self.contents:
+            for attempt in range(self.max_retries + 1):
+                await self.limiter.acquire(chat_id)
+                try:
+                    await self._send(chat_id, content)
+                    break
+                except TelegramRetryAfter as e:
+                    self.stats.flood_waits += 1
+                    if attempt == self.max_retries:
+                        return FAILED, e.message
+                    logger.warning("Flood wait %ss during broadcast %s", e.retry_after, self.job_id)
+                    # a flood wait during a broadcast concerns the whole bot
+                    self.limiter.global_bucket.pause(e.retry_after)
+                    self.limiter.pause(chat_id, e.retry_after)
+                except TelegramForbiddenError as e:
+                    return BLOCKED, e.message
+                except TelegramAPIError as e:
+                    return FAILED, e.message
+                except Exception as e:
+                    logger.exception("Broadcast %s failed for chat %s", self.job_id, chat_id)
+                    return FAILED, repr(e)
+        return SENT, None
+
+    async def _send(self, chat_id: int | str, content: Dict[str, Any]) -> Any:
+        params = {"chat_id": chat_id, **content, **self.params}
+        if self.parse_mode is None:
+            return await self.bot.send_message(**params)
+        return await try_with_md(self.bot.send_message, params, parse_mode=self.parse_mode)
+
+    async def _flush(self, checkpoint: _Checkpoint) -> None:
+        if self._results:
+            results, self._results = self._results, []
+            await asyncio.to_thread(checkpoint.record, results)
+
+    async def _report_loop(self, checkpoint: _Checkpoint) -> None:
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            await self._flush(checkpoint)
+            await self._report()
+
+    async def _report(self) -> None:
+        if self.progress is None:
+            return
+        try:
+            result = self.progress(self.stats)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.exception("Broadcast progress callback failed")
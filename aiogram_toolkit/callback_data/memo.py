@@ -0,0 +1,93 @@
+"""
+Per-update memo of unpacked callback data.
+
+One callback query is typically unpacked by every callback filter of the
+router, by `safe_cd_unpack` helpers and again by the dispatch middleware.
+Inside an unpack scope, `memo_unpack(cls, payload)` parses each
+`(cls, payload)` pair once per update; later calls return the same
+instance or re-raise the same error.
+
+`DeeplinkDispatcherMiddleware` opens a scope for every update. Without it,
+register `CallbackMemoMiddleware` as an outer update middleware:
+
+    dp.update.outer_middleware(CallbackMemoMiddleware())
+
+`BaseCB.unpack()` is memoized as well, so aiogram's `BaseCB.filter()`
+benefits without changes. The memoized instance is shared by all filters
+and the handler of the update: treat it as read-only.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+_memo: ContextVar[Dict[Tuple[type, Any], Any] | None] = ContextVar(
+    "aiogram_toolkit_unpack_memo", default=None
+)
+
+
+class _Failed:
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+
+def memo_unpack(cls: Any, payload: Any, unpack: Callable[[Any], Any] | None = None) -> Any:
+    """
+    `cls.unpack(payload)`, parsed at most once per unpack scope.
+
+    Args:
+        unpack: Parser to memoize; `cls.unpack` by default.
+
+    Raises:
+        Whatever the parser raised, also on memo hits.
+    """
+    memo = _memo.get()
+    if memo is None:
+        return (unpack or cls.unpack)(payload)
+
+    key = (cls, payload)
+    result = memo.get(key)
+    if result is None:
+        try:
+            result = memo[key] = (unpack or cls.unpack)(payload)
+        except Exception as e:
+            memo[key] = _Failed(e)
+            raise
+        return result
+
+    if result.__class__ is _Failed:
+        # a fresh traceback instead of one growing with every re-raise
+        raise result.error.with_traceback(None)
+    return result
+
+
+@contextmanager
+def unpack_scope() -> Iterator[None]:
+    """Memoize unpacking until exit; nested scopes share the outermost memo."""
+    if _memo.get() is not None:
+        yield
+        return
+
+    token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(token)
+
+
+class CallbackMemoMiddleware(BaseMiddleware):
+    """Opens an unpack scope for each update (register as outer middleware)."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        with unpack_scope():
+            return await handler(event, data)
@@ -1,12 +1,14 @@
 from functools import wraps
 
+from ..memo import memo_unpack
+
 def safe_cd_unpack(callback_cls):
     """Decorator to safely unpack callback data for filters."""
     def decorator(filter_func):
         @wraps(filter_func)
         def wrapper(c):
             try:
-                cd = callback_cls.unpack(c.data)
+                cd = memo_unpack(callback_cls, c.data)
 
                 return filter_func(cd)  # Pass unpacked object to the filter function
             except (TypeError, ValueError):
@@ -22,7 +24,7 @@ def safe_cd_unpack_simple(filter_func):
     async def wrapper(self, c):
         try:
             callback_cls = self.ctx.cbu.Callback
-            cd = callback_cls.unpack(c.data)
+            cd = memo_unpack(callback_cls, c.data)
             return await filter_func(self, cd)
         except (AttributeError, TypeError, ValueError):
             return False
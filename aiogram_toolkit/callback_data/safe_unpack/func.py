@@ -1,9 +1,11 @@
 from aiogram.types import CallbackQuery
 from aiogram.filters.callback_data import CallbackData
 
+from ..memo import memo_unpack
+
 
 def safe_cd_unpack(c: CallbackQuery, callback_cls: CallbackData):
     try:
-        return callback_cls.unpack(c.data)
+        return memo_unpack(callback_cls, c.data)
     except (TypeError, ValueError):
         return False
\ No newline at end of file
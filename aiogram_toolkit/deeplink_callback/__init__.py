@@ -2,11 +2,17 @@ from .config import callback_config
 from .base import BaseCB
 from .registry import CallbackRegistry
 from .middleware import DeeplinkDispatcherMiddleware
+from .cleanup import MessageCleaner
+from .store import MemoryPayloadStore, PayloadStore, SQLitePayloadStore
 
 __all__ = [
     "BaseCB",
     "CallbackRegistry",
     "DeeplinkDispatcherMiddleware",
+    "MessageCleaner",
+    "MemoryPayloadStore",
+    "PayloadStore",
+    "SQLitePayloadStore",
 ]
 
 
@@ -19,3 +25,12 @@ def set_bot_username(username: str) -> None:
     Must be called once at application startup.
     """
     callback_config.bot_username = username
+
+
+def set_payload_store(store: PayloadStore | None) -> None:
+    """
+    Keep oversized `BaseCB` payloads in `store` and send short tokens instead.
+
+    Call once at startup, before any keyboard is built; None disables it.
+    """
+    callback_config.payload_store = store
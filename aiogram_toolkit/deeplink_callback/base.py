@@ -1,5 +1,16 @@
-from aiogram.filters.callback_data import CallbackData
+import re
+from typing import Any, Self
+
+from aiogram.filters.callback_data import MAX_CALLBACK_LENGTH, CallbackData
+from ..callback_data.memo import memo_unpack
+from .codec import FAIL, compile_codec
 from .config import callback_config
+from .store import TOKEN_LENGTH, TOKEN_MARK, make_token
+
+#: Telegram limit for the /start parameter
+MAX_DEEPLINK_LENGTH = 64
+# characters Telegram accepts in the /start parameter
+_START_SAFE = re.compile(r"[A-Za-z0-9_-]*")
 
 
 class BaseCB(CallbackData, prefix="base_cb"):
@@ -9,12 +20,25 @@ class BaseCB(CallbackData, prefix="base_cb"):
     Features:
     - shared CallbackData behavior
     - safe deeplink generation
+    - oversized payloads replaced by store tokens (see `set_payload_store`)
+    - pack/unpack precompiled from the field types (see `codec`)
     """
 
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        # fields are only complete once pydantic has built the class
+        cls.__codec__ = compile_codec(cls)
+
     def deeplink(self) -> str:
         """
         Generate a /start deeplink with packed payload.
 
+        Raises:
+            ValueError: If the payload exceeds 64 characters and no payload
+                store is configured, or its store reference would not be
+                /start-safe (use a separator like `sep="-"`).
+
         Example:
             BaseCB(...).deeplink()
         """
@@ -24,8 +48,95 @@ class BaseCB(CallbackData, prefix="base_cb"):
                 "Call set_bot_username() at startup."
             )
 
+        payload = self._pack_payload()
+        if len(payload) > MAX_DEEPLINK_LENGTH:
+            if callback_config.payload_store is None:
+                raise ValueError(
+                    f"Resulted deeplink payload is too long! "
+                    f"len({payload!r}) > {MAX_DEEPLINK_LENGTH}"
+                )
+            # the token and its mark are /start-safe, the class head may not be
+            if not _START_SAFE.fullmatch(self.__prefix__ + self.__separator__):
+                raise ValueError(
+                    f"Deeplink reference of {type(self).__name__} would not be /start-safe; "
+                    f"use a prefix and separator from [A-Za-z0-9_-]"
+                )
+            payload = self._reference(payload)
+
         return (
             f"https://t.me/"
             f"{callback_config.bot_username}"
-            f"?start={self.pack()}"
-        )
\ No newline at end of file
+            f"?start={payload}"
+        )
+
+    def pack(self) -> str:
+        """
+        Generate callback data; with a payload store, payloads over 64
+        bytes are stored and replaced by a token.
+        """
+        payload = self._pack_payload()
+        if len(payload.encode()) <= MAX_CALLBACK_LENGTH:
+            return payload
+        if callback_config.payload_store is not None:
+            return self._reference(payload)
+        raise ValueError(
+            f"Resulted callback data is too long! "
+            f"len({payload!r}.encode()) > {MAX_CALLBACK_LENGTH}"
+        )
+
+    @classmethod
+    def unpack(cls, value: str) -> Self:
+        """Parse callback data, resolving store tokens; memoized per update."""
+        return memo_unpack(cls, value, cls._unpack)
+
+    @classmethod
+    def _reference_token(cls, value: str) -> str | None:
+        """Store token if `value` has the shape of this class's payload reference."""
+        head = len(cls.__prefix__) + len(cls.__separator__)
+        if (
+            len(value) == head + len(TOKEN_MARK) + TOKEN_LENGTH
+            and value.startswith(TOKEN_MARK, head)
+            and value.startswith(cls.__prefix__ + cls.__separator__)
+        ):
+            return value[head + len(TOKEN_MARK):]
+        return None
+
+    @classmethod
+    def _unpack(cls, value: str) -> Self:
+        store = callback_config.payload_store
+        if store is not None:
+            token = cls._reference_token(value)
+            if token is not None:
+                payload = store.get(token)
+                # unknown or expired tokens are parsed as plain values
+                if payload is not None:
+                    value = payload
+
+        codec = cls.__dict__.get("__codec__")
+        if codec is not None:
+            cb = codec.unpack(value)
+            if cb is not FAIL:
+                return cb
+        return super().unpack(value)
+
+    def _pack_payload(self) -> str:
+        # CallbackData.pack() without the length check
+        codec = type(self).__dict__.get("__codec__")
+        if codec is not None:
+            return codec.pack(self)
+
+        result = [self.__prefix__]
+        for key, value in self.model_dump(mode="python").items():
+            encoded = self._encode_value(key, value)
+            if self.__separator__ in encoded:
+                raise ValueError(
+                    f"Separator symbol {self.__separator__!r} can not be used "
+                    f"in value {key}={encoded!r}"
+                )
+            result.append(encoded)
+        return self.__separator__.join(result)
+
+    def _reference(self, payload: str) -> str:
+        token = make_token(payload)
+        callback_config.payload_store.put(token, payload)
+        return f"{self.__prefix__}{self.__separator__}{TOKEN_MARK}{token}"
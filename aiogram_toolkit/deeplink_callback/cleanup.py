@@ -0,0 +1,132 @@
+import asyncio
+import time
+from typing import Dict, List, Tuple
+
+from aiogram import Bot
+from aiogram.types import Message
+
+from ..logger import logger
+
+
+#: Bot API limit for a single deleteMessages call
+MAX_DELETE_BATCH = 100
+
+
+class MessageCleaner:
+    """
+    Background queue deleting /start deeplink messages off the update path.
+
+    Deletions are grouped per chat and sent with `deleteMessages` when
+    several are pending. Each chat is hit at most once per
+    `per_chat_interval` seconds.
+
+    Usage:
+        cleaner = MessageCleaner()
+        dp.update.middleware(DeeplinkDispatcherMiddleware(registry, cleaner=cleaner))
+        dp.shutdown.register(cleaner.close)
+    """
+
+    def __init__(
+        self,
+        max_pending: int = 10_000,
+        per_chat_interval: float = 1.0,
+    ) -> None:
+        if max_pending <= 0:
+            raise ValueError("max_pending must be positive")
+
+        self.max_pending = max_pending
+        self.per_chat_interval = per_chat_interval
+
+        self._pending: Dict[Tuple[Bot, int], List[int]] = {}
+        self._next_allowed: Dict[Tuple[Bot, int], float] = {}
+        self._size = 0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return self._size
+
+    def schedule(self, message: Message) -> bool:
+        """
+        Queue a message for deletion without awaiting anything.
+
+        Returns:
+            False if the cleaner is closed, full or the message is not
+            bound to a bot; the caller should delete it itself.
+        """
+        if self._closed or self._size >= self.max_pending or message.bot is None:
+            return False
+
+        key = (message.bot, message.chat.id)
+        self._pending.setdefault(key, []).append(message.message_id)
+        self._size += 1
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+        return True
+
+    async def close(self) -> None:
+        """Stop the worker and delete everything still queued."""
+        self._closed = True
+        if self._task is not None:
+            # the worker finishes the batch it is deleting, then returns
+            self._wakeup.set()
+            await self._task
+            self._task = None
+
+        while self._pending:
+            key, message_ids = self._pending.popitem()
+            self._size -= len(message_ids)
+            for i in range(0, len(message_ids), MAX_DELETE_BATCH):
+                await self._delete(key, message_ids[i:i + MAX_DELETE_BATCH])
+
+    async def _run(self) -> None:
+        while not self._closed:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._pending and not self._closed:
+                now = time.monotonic()
+                due = [
+                    key for key in self._pending
+                    if self._next_allowed.get(key, 0.0) <= now
+                ]
+
+                for key in due:
+                    if self._closed:
+                        break
+                    message_ids = self._pending.pop(key)
+                    batch = message_ids[:MAX_DELETE_BATCH]
+                    if len(message_ids) > MAX_DELETE_BATCH:
+                        self._pending[key] = message_ids[MAX_DELETE_BATCH:]
+                    self._size -= len(batch)
+                    self._next_allowed[key] = now + self.per_chat_interval
+                    await self._delete(key, batch)
+
+                # forget chats that have been idle long enough
+                now = time.monotonic()
+                for key in [k for k, t in self._next_allowed.items() if t <= now]:
+                    if key not in self._pending:
+                        del self._next_allowed[key]
+
+                if self._pending:
+                    delay = min(self._next_allowed.get(k, 0.0) for k in self._pending) - now
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), max(delay, 0.0))
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wakeup.clear()
+
+    @staticmethod
+    async def _delete(key: Tuple[Bot, int], message_ids: List[int]) -> None:
+        bot, chat_id = key
+        try:
+            if len(message_ids) == 1:
+                await bot.delete_message(chat_id, message_ids[0])
+            else:
+                await bot.delete_messages(chat_id, message_ids)
+        except Exception as e:
+            logger.debug("Deeplink cleanup failed in chat %s: %s", chat_id, e)
@@ -0,0 +1,222 @@
+"""
+Precompiled pack/unpack for `BaseCB` subclasses.
+
+`CallbackData.pack()` dumps the model and converts every value through a
+chain of isinstance checks; `unpack()` runs full pydantic validation. For
+the common field types (int, str, bool, str-valued Enum and their
+Optional forms) the conversion is known when the class is created, so
+each subclass compiles one encoder and one decoder per field instead.
+
+The wire format is exactly `CallbackData`'s. Classes using anything else
+(other types, constraints, validators, serializers, strict mode, a custom
+`__init__` or `model_post_init`) get no codec and keep the stock implementation; so does any single value the
+fast path does not recognise (e.g. "+5" for an int), which is then parsed
+by pydantic as before.
+"""
+
+import typing
+from enum import Enum
+from types import NoneType, UnionType
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+#: Returned by decoders for values only pydantic can judge
+FAIL: Any = object()
+# marks fields whose "" is not replaced by the default
+_NO_EMPTY: Any = object()
+
+_set = object.__setattr__
+
+
+# ---- encoders: value -> str, or None to use CallbackData._encode_value --------
+def _encode_int(value: Any) -> str | None:
+    return str(value) if value.__class__ is int else None
+
+
+def _encode_str(value: Any) -> str | None:
+    return value if value.__class__ is str else None
+
+
+def _encode_bool(value: Any) -> str | None:
+    if value.__class__ is bool:
+        return "1" if value else "0"
+    return None
+
+
+def _enum_encoder(enum_cls: Type[Enum]) -> Callable[[Any], str | None]:
+    def encode(value: Any) -> str | None:
+        return str(value.value) if value.__class__ is enum_cls else None
+
+    return encode
+
+
+def _optional_encoder(encode: Callable[[Any], str | None]) -> Callable[[Any], str | None]:
+    def encode_optional(value: Any) -> str | None:
+        return "" if value is None else encode(value)
+
+    return encode_optional
+
+
+# ---- decoders: str -> value, or FAIL ----------------------------------------
+def _decode_int(value: str) -> Any:
+    # exactly what int() and pydantic agree on
+    digits = value[1:] if value[:1] == "-" else value
+    if digits.isascii() and digits.isdigit():
+        return int(value)
+    return FAIL
+
+
+def _decode_str(value: str) -> Any:
+    return value
+
+
+_BOOLS = {"1": True, "0": False}
+
+
+def _decode_bool(value: str) -> Any:
+    return _BOOLS.get(value, FAIL)
+
+
+def _enum_decoder(enum_cls: Type[Enum]) -> Callable[[str], Any] | None:
+    if not all(isinstance(member.value, str) for member in enum_cls):
+        return None
+    members = {member.value: member for member in enum_cls}
+
+    def decode(value: str) -> Any:
+        return members.get(value, FAIL)
+
+    return decode
+
+
+# model_config options changing how values are parsed or stored
+_CONFIG_OPTIONS = (
+    "strict", "use_enum_values", "str_strip_whitespace", "str_to_lower",
+    "str_to_upper", "str_min_length", "str_max_length",
+)
+
+_SCALARS = {
+    int: (_encode_int, _decode_int),
+    str: (_encode_str, _decode_str),
+    bool: (_encode_bool, _decode_bool),
+}
+
+
+def _field_codec(annotation: Any) -> Tuple[Callable, Callable] | None:
+    optional = False
+    if typing.get_origin(annotation) in (typing.Union, UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not NoneType]
+        if len(args) != 1:
+            return None
+        annotation, optional = args[0], True
+
+    if annotation in _SCALARS:
+        encode, decode = _SCALARS[annotation]
+    elif isinstance(annotation, type) and issubclass(annotation, Enum):
+        encode, decode = _enum_encoder(annotation), _enum_decoder(annotation)
+        if decode is None:
+            return None
+    else:
+        return None
+
+    # "" of an Optional field is handled by the caller like CallbackData does
+    if optional:
+        return _optional_encoder(encode), decode
+    return encode, decode
+
+
+class Codec:
+    """Compiled pack/unpack of one `CallbackData` class."""
+
+    __slots__ = ("cls", "prefix", "sep", "names", "encoders", "decoders", "private")
+
+    def __init__(self, cls: type, fields: List[Tuple[str, Callable, Callable, Any]]) -> None:
+        self.cls = cls
+        self.prefix = cls.__prefix__
+        self.sep = cls.__separator__
+        self.names = tuple(name for name, *_ in fields)
+        self.encoders = tuple((name, encode) for name, encode, _, _ in fields)
+        self.decoders = tuple((name, decode, empty) for name, _, decode, empty in fields)
+        self.private = bool(cls.__private_attributes__)
+
+    def pack(self, cb: Any) -> str:
+        """Payload without the length check; raises like `CallbackData.pack()`."""
+        sep = self.sep
+        values = cb.__dict__
+        parts = [self.prefix]
+        for name, encode in self.encoders:
+            value = values[name]
+            encoded = encode(value)
+            if encoded is None:
+                encoded = cb._encode_value(name, value)
+            if sep in encoded:
+                raise ValueError(
+                    f"Separator symbol {sep!r} can not be used "
+                    f"in value {name}={encoded!r}"
+                )
+            parts.append(encoded)
+        return sep.join(parts)
+
+    def unpack(self, value: str) -> Any:
+        """Instance parsed from `value`, or FAIL to let `CallbackData.unpack()` decide."""
+        prefix, *parts = value.split(self.sep)
+        if prefix != self.prefix or len(parts) != len(self.decoders):
+            return FAIL
+
+        values: Dict[str, Any] = {}
+        for (name, decode, empty), part in zip(self.decoders, parts):
+            if part == "" and empty is not _NO_EMPTY:
+                values[name] = empty
+                continue
+            decoded = decode(part)
+            if decoded is FAIL:
+                return FAIL
+            values[name] = decoded
+
+        if self.private:
+            return self.cls.model_construct(**values)
+
+        # the values are already what validation would produce
+        cb = self.cls.__new__(self.cls)
+        _set(cb, "__dict__", values)
+        _set(cb, "__pydantic_fields_set__", set(self.names))
+        _set(cb, "__pydantic_extra__", None)
+        _set(cb, "__pydantic_private__", None)
+        return cb
+
+
+def compile_codec(cls: type) -> Codec | None:
+    """Codec for `cls`, or None if any of its fields needs pydantic."""
+    config = cls.model_config
+    if config.get("extra") == "allow" or any(config.get(option) for option in _CONFIG_OPTIONS):
+        return None
+
+    # instances are built without calling these
+    if cls.__init__ is not BaseModel.__init__ or cls.__pydantic_post_init__ is not None:
+        return None
+
+    decorators = cls.__pydantic_decorators__
+    if any((
+        decorators.validators, decorators.field_validators, decorators.root_validators,
+        decorators.model_validators, decorators.field_serializers,
+        decorators.model_serializers, decorators.computed_fields,
+    )):
+        return None
+
+    fields = []
+    for name, field in cls.model_fields.items():
+        if field.metadata or field.default_factory is not None:
+            return None
+        compiled = _field_codec(field.annotation)
+        if compiled is None:
+            return None
+
+        # CallbackData.unpack(): "" of a nullable field means its default
+        empty = _NO_EMPTY
+        nullable = not field.is_required() or typing.get_origin(field.annotation) in (typing.Union, UnionType)
+        if nullable and field.default != "":
+            empty = None if field.default is PydanticUndefined else field.default
+        fields.append((name, *compiled, empty))
+
+    return Codec(cls, fields)
@@ -4,6 +4,8 @@ class CallbackConfig:
     Must be initialized at startup.
     """
     bot_username: str | None = None
+    # oversized BaseCB payloads are kept here when set (see store.py)
+    payload_store: "PayloadStore | None" = None  # type: ignore  # noqa: F821
 
 
 callback_config = CallbackConfig()
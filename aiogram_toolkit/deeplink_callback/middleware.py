@@ -3,6 +3,9 @@ from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery, TelegramObject
 from typing import Callable, Awaitable, Any
 
+from ..callback_data.memo import memo_unpack, unpack_scope
+from .cleanup import MessageCleaner
+from .config import callback_config
 from .registry import CallbackRegistry
 from ..logger import logger
 
@@ -11,10 +14,33 @@ class DeeplinkDispatcherMiddleware(BaseMiddleware):
     """
     Middleware that intercepts /start deeplinks and callback queries
     before aiogram routing and dispatches them via CallbackRegistry.
+
+    The registry is frozen on the first update, so all triggers must be
+    registered before polling starts.
+
+    With a `cleaner`, /start messages of successful triggers are deleted in
+    the background instead of inline.
+
+    Payload-store tokens (see `set_payload_store`) keep the class prefix,
+    so they are matched as usual and resolved by `BaseCB.unpack()`. Stores
+    with an async `load(token)` (e.g. `SQLitePayloadStore`) are warmed here
+    first, so resolving them does not block the event loop.
+
+    Each update runs in an unpack scope (see `callback_data.memo`), so the
+    payload parsed here is reused by callback filters and handlers.
     """
 
-    def __init__(self, registry: CallbackRegistry):
+    def __init__(
+        self,
+        registry: CallbackRegistry,
+        cleaner: MessageCleaner | None = None,
+    ):
         self.registry = registry
+        self.cleaner = cleaner
+        # FSM state lookups performed / avoided because no state-scoped
+        # trigger exists for the unpacked (cb_cls, action)
+        self.state_lookups = 0
+        self.state_lookups_skipped = 0
 
     async def __call__(
         self,
@@ -22,6 +48,18 @@ class DeeplinkDispatcherMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict,
     ) -> Any:
+        with unpack_scope():
+            return await self._dispatch(handler, event, data)
+
+    async def _dispatch(
+        self,
+        handler: Callable[[TelegramObject, dict], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict,
+    ) -> Any:
+
+        if not self.registry.frozen:
+            self.registry.freeze()
 
         payload: str | None = None
 
@@ -43,15 +81,20 @@ class DeeplinkDispatcherMiddleware(BaseMiddleware):
 
         # ---- unpack callback ---------------------------------------------
 
-        cb = None
-        for cb_cls in self.registry.cb_classes:
-            try:
-                cb = cb_cls.unpack(payload)
-                break
-            except Exception:
-                continue
+        cb_cls = self.registry.match(payload)
+        if cb_cls is None:
+            return await handler(event, data)
+
+        load = getattr(callback_config.payload_store, "load", None)
+        reference_token = getattr(cb_cls, "_reference_token", None)
+        if load is not None and reference_token is not None:
+            token = reference_token(payload)
+            if token is not None:
+                await load(token)
 
-        if cb is None:
+        try:
+            cb = memo_unpack(cb_cls, payload)
+        except Exception:
             return await handler(event, data)
 
         # ---- resolve trigger ---------------------------------------------
@@ -59,7 +102,11 @@ class DeeplinkDispatcherMiddleware(BaseMiddleware):
         fsm: FSMContext | None = data.get("state")
 
         if fsm:
-            state = await fsm.get_state()
+            if self.registry.needs_state(cb):
+                state = await fsm.get_state()
+                self.state_lookups += 1
+            else:
+                self.state_lookups_skipped += 1
 
         trigger = self.registry.resolve(cb, state)
         if not trigger:
@@ -83,6 +130,9 @@ class DeeplinkDispatcherMiddleware(BaseMiddleware):
             and event.text
             and event.text.startswith("/start")
         ):
+            if self.cleaner is not None and self.cleaner.schedule(event):
+                return None
+
             try:
                 await event.delete()
             except Exception:
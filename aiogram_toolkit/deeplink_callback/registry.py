@@ -1,6 +1,6 @@
-from typing import Callable, Awaitable, Dict, Set, Type, Iterable
+from typing import Callable, Awaitable, Dict, Set, Type, Iterable, Tuple
 from aiogram.filters.callback_data import CallbackData
-from .trigger import TriggerSpec
+from .trigger import TriggerSpec, TriggerBucket
 from aiogram.fsm.state import State
 from .trigger import Trigger
 
@@ -14,12 +14,21 @@ class CallbackRegistry:
     """
     Central registry mapping (CallbackData class, action) to triggers.
 
-    Frozen after startup.
+    Frozen after startup: `freeze()` compiles the registered specs into a
+    lookup table, after which `resolve()` is a pair of dict lookups and
+    `register()` raises.
     """
 
     def __init__(self) -> None:
         self.cb_classes: Set[Type[CallbackData]] = set()
         self.handlers: Dict[TriggerSpec, Trigger] = {}
+        # separator -> prefix -> class
+        self._prefixes: Dict[str, Dict[str, Type[CallbackData]]] = {}
+        self._index: Dict[Tuple[Type[CallbackData], object], TriggerBucket] | None = None
+
+    @property
+    def frozen(self) -> bool:
+        return self._index is not None
 
     def register(
         self,
@@ -29,6 +38,18 @@ class CallbackRegistry:
         *,
         states: Iterable[State | str] | None = None,
     ) -> None:
+        if self.frozen:
+            raise RuntimeError(
+                f"Cannot register {cb_cls.__name__}: registry is frozen"
+            )
+
+        by_prefix = self._prefixes.setdefault(cb_cls.__separator__, {})
+        known = by_prefix.setdefault(cb_cls.__prefix__, cb_cls)
+        if known is not cb_cls:
+            raise RuntimeError(
+                f"Prefix {cb_cls.__prefix__!r} of {cb_cls.__name__} "
+                f"is already used by {known.__name__}"
+            )
         self.cb_classes.add(cb_cls)
 
         actions = action if isinstance(action, (list, tuple, set)) else (action,)
@@ -49,7 +70,73 @@ class CallbackRegistry:
             self.handlers[spec] = trigger
 
 
+    def match(self, payload: str) -> Type[CallbackData] | None:
+        """
+        Return the registered class whose prefix the payload carries.
+
+        Only the prefix is inspected, so a returned class may still fail
+        to unpack a malformed payload. Never raises.
+        """
+        for sep, by_prefix in self._prefixes.items():
+            cb_cls = by_prefix.get(payload.partition(sep)[0])
+            if cb_cls is not None:
+                return cb_cls
+        return None
+
+    def freeze(self) -> None:
+        """
+        Compile registered handlers into a `(cb_cls, action)` lookup table.
+
+        Idempotent. Registration order is preserved: when several specs
+        claim the same state, the first registered one wins, exactly as
+        with the linear scan.
+        """
+        if self.frozen:
+            return
+
+        index: Dict[Tuple[Type[CallbackData], object], TriggerBucket] = {}
+        for spec, trigger in self.handlers.items():
+            bucket = index.setdefault((spec.cb_cls, spec.action), TriggerBucket())
+            if spec.states is None:
+                if bucket.fallback is None:
+                    bucket.fallback = trigger
+            else:
+                for state in spec.states:
+                    bucket.by_state.setdefault(state, trigger)
+
+        for bucket in index.values():
+            bucket.state_scoped = any(t is not bucket.fallback for t in bucket.by_state.values())
+        self._index = index
+
     def resolve(self, cb: CallbackData, current_state: str | None) -> Trigger | None:
+        if self._index is None:
+            return self._scan(cb, current_state)
+
+        bucket = self._index.get((type(cb), cb.action))
+        if bucket is None:
+            return None
+
+        if current_state is not None:
+            trigger = bucket.by_state.get(current_state)
+            if trigger is not None:
+                return trigger
+
+        return bucket.fallback
+
+    def needs_state(self, cb: CallbackData) -> bool:
+        """
+        Whether resolving `cb` depends on the current FSM state.
+
+        Lets callers skip a (possibly remote) state lookup. Always True
+        before `freeze()`.
+        """
+        if self._index is None:
+            return True
+
+        bucket = self._index.get((type(cb), cb.action))
+        return bucket is not None and bucket.state_scoped
+
+    def _scan(self, cb: CallbackData, current_state: str | None) -> Trigger | None:
         # 1. exact state match
         for spec, trigger in self.handlers.items():
             if (
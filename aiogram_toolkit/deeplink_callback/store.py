@@ -0,0 +1,201 @@
+"""
+Server-side storage for callback payloads that exceed Telegram's limits.
+
+`callback_data` is capped at 64 bytes and `?start=` at 64 characters. With
+a payload store configured (`set_payload_store()`), `BaseCB.pack()` and
+`BaseCB.deeplink()` keep oversized payloads here and embed only a short
+reference `<prefix><sep>_<token>`. `BaseCB.unpack()` resolves references,
+so registries, `DeeplinkDispatcherMiddleware` and aiogram callback filters
+work unchanged. The reference is only /start-safe if the class separator
+is (e.g. `sep="-"`); `deeplink()` refuses references that are not.
+
+Tokens are content hashes: packing the same payload twice yields the same
+token, and a token reveals nothing about the payload.
+
+Example:
+    set_payload_store(SQLitePayloadStore("payloads.sqlite"))
+"""
+
+import asyncio
+import base64
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Protocol, Set, Tuple
+
+from ..logger import logger
+
+#: Marks a packed value as a payload reference (from /start's [A-Za-z0-9_-])
+TOKEN_MARK = "_"
+#: Length of a token (96-bit hash, base64url)
+TOKEN_LENGTH = 16
+
+
+def make_token(payload: str) -> str:
+    digest = hashlib.blake2b(payload.encode(), digest_size=12).digest()
+    return base64.urlsafe_b64encode(digest).decode()
+
+
+class PayloadStore(Protocol):
+    """
+    Token -> payload mapping; both calls run inline, so keep them O(1).
+
+    Stores doing I/O may also provide `async def load(token)`, which
+    `DeeplinkDispatcherMiddleware` awaits before `get(token)` so the lookup
+    is served from memory.
+    """
+
+    def put(self, token: str, payload: str) -> None: ...
+
+    def get(self, token: str) -> str | None: ...
+
+
+class MemoryPayloadStore:
+    """
+    In-process LRU store with TTL.
+
+    Tokens do not survive a restart; use `SQLitePayloadStore` for buttons
+    and links that must outlive the process.
+    """
+
+    def __init__(self, max_size: int = 100_000, ttl: float = 30 * 86400) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, token: str, payload: str, expires: float | None = None) -> None:
+        self._entries[token] = (time.time() + self.ttl if expires is None else expires, payload)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, token: str) -> str | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        if time.time() >= entry[0]:
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return entry[1]
+
+    def remaining(self, token: str) -> float:
+        """Seconds until `token` expires; 0 if it is not stored."""
+        entry = self._entries.get(token)
+        return max(0.0, entry[0] - time.time()) if entry is not None else 0.0
+
+
+class SQLitePayloadStore:
+    """
+    Persistent store in a SQLite file, fronted by an in-process LRU of hot tokens.
+
+    Repacking a cached payload costs no write until half of its TTL has
+    passed; expired rows are purged every `purge_every` writes.
+
+    SQLite calls block, so inside a running event loop writes go to a
+    worker thread (the payload is served from the LRU meanwhile) and reads
+    are expected to be warmed by `load()`; `get()` only reads the file
+    inline on an LRU miss. Use `aclose()` to wait for pending writes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 30 * 86400,
+        cache_size: int = 1024,
+        purge_every: int = 1000,
+    ) -> None:
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._cache = MemoryPayloadStore(cache_size, ttl)
+        self._writes = 0
+        self._writing: Set[asyncio.Future] = set()
+        # the connection is shared with worker threads
+        self._lock = threading.Lock()
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS callback_payloads ("
+            " token TEXT PRIMARY KEY, payload TEXT NOT NULL, expires REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS callback_payloads_expires ON callback_payloads (expires)"
+        )
+        self.db.commit()
+
+    def put(self, token: str, payload: str) -> None:
+        if self._cache.remaining(token) > self.ttl / 2:
+            return
+
+        expires = time.time() + self.ttl
+        self._cache.put(token, payload, expires)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(token, payload, expires)
+            return
+        future = asyncio.ensure_future(asyncio.to_thread(self._write, token, payload, expires))
+        self._writing.add(future)
+        future.add_done_callback(self._written)
+
+    def _written(self, future: asyncio.Future) -> None:
+        self._writing.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Storing a callback payload failed", exc_info=future.exception())
+
+    def _write(self, token: str, payload: str, expires: float) -> None:
+        with self._lock:
+            self.db.execute(
+                "INSERT INTO callback_payloads (token, payload, expires) VALUES (?, ?, ?)"
+                " ON CONFLICT (token) DO UPDATE SET expires = excluded.expires",
+                (token, payload, expires),
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self.db.execute("DELETE FROM callback_payloads WHERE expires < ?", (time.time(),))
+            self.db.commit()
+
+    def get(self, token: str) -> str | None:
+        payload = self._cache.get(token)
+        if payload is not None:
+            return payload
+        return self._cached(token, self._read(token))
+
+    async def load(self, token: str) -> None:
+        """Bring `token` into the LRU without blocking the event loop."""
+        if self._cache.get(token) is None:
+            self._cached(token, await asyncio.to_thread(self._read, token))
+
+    def _read(self, token: str) -> Tuple[str, float] | None:
+        with self._lock:
+            return self.db.execute(
+                "SELECT payload, expires FROM callback_payloads WHERE token = ?", (token,)
+            ).fetchone()
+
+    def _cached(self, token: str, row: Tuple[str, float] | None) -> str | None:
+        # the LRU is only touched from the caller's thread
+        if row is None or row[1] <= time.time():
+            return None
+        self._cache.put(token, row[0], expires=row[1])
+        return row[0]
+
+    def close(self) -> None:
+        """Close the file; payloads still being written in threads may be lost."""
+        with self._lock:
+            self.db.close()
+
+    async def aclose(self) -> None:
+        """Wait for pending writes, then close the file."""
+        if self._writing:
+            await asyncio.gather(*self._writing, return_exceptions=True)
+        await asyncio.to_thread(self.close)
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Type
+from dataclasses import dataclass, field
+from typing import Dict, Type
 from aiogram.filters.callback_data import CallbackData
 from typing import Protocol
 from aiogram.types import TelegramObject
@@ -20,3 +20,12 @@ class TriggerSpec:
     cb_cls: Type[CallbackData]
     action: object
     states: frozenset[str] | None  # None = any state
+
+
+@dataclass
+class TriggerBucket:
+    """Compiled triggers for one (cb_cls, action) pair."""
+    by_state: Dict[str, Trigger] = field(default_factory=dict)
+    fallback: Trigger | None = None  # stateless spec
+    # True if the current FSM state can change the picked trigger; set by freeze()
+    state_scoped: bool = False
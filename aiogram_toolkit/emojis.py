@@ -78,6 +78,10 @@ class Emoji(Enum):
     POUTING_FACE = "😡"
 
     def as_reaction(self) -> ReactionTypeEmoji:
-        """Convert enum value to aiogram's ReactionTypeEmoji."""
-        return ReactionTypeEmoji(emoji=self.value)
-    # ...
\ No newline at end of file
+        """Convert enum value to aiogram's ReactionTypeEmoji (shared, immutable instance)."""
+        return _REACTIONS[self]
+    # ...
+
+
+# ReactionTypeEmoji is frozen, so one validated instance per member is enough
+_REACTIONS = {emoji: ReactionTypeEmoji(emoji=emoji.value) for emoji in Emoji}
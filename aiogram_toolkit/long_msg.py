@@ -13,9 +13,12 @@ Typical use case:
 Example:
     text = f"Header{BR}Body{BR}Footer"
     parts = safe_long_msg(text)
+
+For very large inputs, `iter_long_msg` / `aiter_long_msg` split a stream
+of fragments without holding the whole text in memory.
 """
 
-from typing import List
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List
 
 #: Default break marker (3× zero-width space)
 BR: str = "\u200b" * 3
@@ -38,6 +41,7 @@ def set_br(br: str) -> None:
 def safe_long_msg(
     text: str,
     max_len: int = 4096,
+    parse_mode: str | None = None,
 ) -> List[str]:
     """
     Split a long string into Telegram-safe chunks.
@@ -51,6 +55,8 @@ def safe_long_msg(
     Args:
         text: Input text.
         max_len: Maximum length of each chunk (Telegram limit: 4096).
+        parse_mode: `ParseMode.MARKDOWN_V2` or `ParseMode.HTML` to split
+            without breaking markup (see `md.split.split_formatted`).
 
     Returns:
         A list of message chunks, each <= max_len characters.
@@ -58,6 +64,10 @@ def safe_long_msg(
     Raises:
         ValueError: If max_len is not positive.
     """
+    if parse_mode is not None:
+        from .md.split import split_formatted
+        return split_formatted(text, parse_mode, max_len)
+
     if max_len <= 0:
         raise ValueError("max_len must be positive")
 
@@ -89,3 +99,144 @@ def safe_long_msg(
         chunks.append(current)
 
     return chunks
+
+
+class _StreamSplitter:
+    """
+    Incremental equivalent of `safe_long_msg`.
+
+    Holds at most one pending chunk, one pending segment (both bounded by
+    `max_len`) and a possible partial break marker between feeds.
+    """
+
+    def __init__(self, max_len: int) -> None:
+        if max_len <= 0:
+            raise ValueError("max_len must be positive")
+        if not BR:
+            raise ValueError("break marker must not be empty")
+
+        self.max_len = max_len
+        self.br = BR
+        self.tail = ""
+        self.current: List[str] = []
+        self.current_len = 0
+        self.segment: List[str] = []
+        self.segment_len = 0
+
+    def feed(self, fragment: str) -> List[str]:
+        out: List[str] = []
+        buf = self.tail + fragment
+        br, start = self.br, 0
+
+        while (idx := buf.find(br, start)) != -1:
+            self._add(buf[start:idx], out)
+            self._end_segment(out)
+            start = idx + len(br)
+
+        # keep a possible break marker prefix for the next fragment
+        keep = min(len(br) - 1, len(buf) - start)
+        self._add(buf[start:len(buf) - keep], out)
+        self.tail = buf[len(buf) - keep:] if keep else ""
+        return out
+
+    def close(self) -> List[str]:
+        out: List[str] = []
+        self._add(self.tail, out)
+        self.tail = ""
+        self._end_segment(out)
+        self._flush(out)
+        return out
+
+    def _add(self, part: str, out: List[str]) -> None:
+        if not part:
+            return
+        self.segment.append(part)
+        self.segment_len += len(part)
+
+        if self.segment_len <= self.max_len:
+            return
+
+        # hard split: the segment alone does not fit
+        self._flush(out)
+        segment = "".join(self.segment)
+        pos = 0
+        while len(segment) - pos > self.max_len:
+            out.append(segment[pos:pos + self.max_len])
+            pos += self.max_len
+        segment = segment[pos:]
+        self.segment = [segment]
+        self.segment_len = len(segment)
+
+    def _end_segment(self, out: List[str]) -> None:
+        if not self.current_len:
+            self.current = self.segment
+            self.current_len = self.segment_len
+        elif self.current_len + self.segment_len <= self.max_len:
+            self.current.extend(self.segment)
+            self.current_len += self.segment_len
+        else:
+            self._flush(out)
+            self.current = self.segment
+            self.current_len = self.segment_len
+        self.segment = []
+        self.segment_len = 0
+
+    def _flush(self, out: List[str]) -> None:
+        if self.current_len:
+            out.append("".join(self.current))
+        self.current = []
+        self.current_len = 0
+
+
+def iter_long_msg(
+    fragments: Iterable[str],
+    max_len: int = 4096,
+) -> Iterator[str]:
+    """
+    Streaming variant of `safe_long_msg`.
+
+    Consumes text fragments (any split, break markers may span fragments)
+    and yields chunks as soon as they are complete. Memory use is bounded
+    by `max_len` plus the largest fragment.
+
+    Produces exactly the chunks `safe_long_msg("".join(fragments))` would.
+
+    Args:
+        fragments: Iterable of text pieces, or a single string.
+        max_len: Maximum length of each chunk (Telegram limit: 4096).
+
+    Raises:
+        ValueError: If max_len is not positive.
+    """
+    splitter = _StreamSplitter(max_len)
+    if isinstance(fragments, str):
+        fragments = (fragments,)
+
+    for fragment in fragments:
+        yield from splitter.feed(fragment)
+    yield from splitter.close()
+
+
+async def aiter_long_msg(
+    fragments: AsyncIterable[str] | Iterable[str],
+    max_len: int = 4096,
+) -> AsyncIterator[str]:
+    """
+    Async variant of `iter_long_msg`, e.g. for text read from a file or
+    a database cursor.
+    """
+    splitter = _StreamSplitter(max_len)
+    if isinstance(fragments, str):
+        fragments = (fragments,)
+
+    if isinstance(fragments, AsyncIterable):
+        async for fragment in fragments:
+            for chunk in splitter.feed(fragment):
+                yield chunk
+    else:
+        for fragment in fragments:
+            for chunk in splitter.feed(fragment):
+                yield chunk
+
+    for chunk in splitter.close():
+        yield chunk
@@ -1,8 +1,24 @@
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.enums.parse_mode import ParseMode
 
+from ..logger import logger
+from .validate import validate
+
 
 async def try_with_md(coroutine, params, force_perform: bool=True, parse_mode: ParseMode=ParseMode.MARKDOWN_V2):
+    # Known-bad markup is sent as plain text directly instead of waiting for
+    # Telegram to reject it
+    text = params.get('text', params.get('caption'))
+    if isinstance(text, str):
+        error = validate(text, parse_mode)
+        if error is not None:
+            logger.warning(
+                "Invalid %s at position %s: %s", parse_mode, error.position, error.reason
+            )
+            if force_perform:
+                return await coroutine(**params)
+            return None
+
     try:
         return await coroutine(**{'parse_mode': parse_mode}, **params)
     except TelegramBadRequest as e:
@@ -10,4 +26,4 @@ async def try_with_md(coroutine, params, force_perform: bool=True, parse_mode: P
             if force_perform:
                 return await coroutine(**params)
         else:
-            raise e
\ No newline at end of file
+            raise e
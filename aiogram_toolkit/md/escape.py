@@ -1,19 +1,108 @@
+from typing import Dict, Iterable, List, Mapping, TypeVar
+
+K = TypeVar("K")
+
+
+# ==============______ENGINE______===========================================================================================  ENGINE
+class Escaper:
+    """
+    Precompiled, table-driven escaper.
+
+    Built once from a `{char: replacement}` table. Escaping runs one
+    C-level `str.replace` per special character actually present, instead
+    of a Python-level loop over every character. Output is identical to
+    replacing each character independently.
+
+    Example:
+        escape = Escaper({"<": "&lt;", "&": "&amp;"})
+        escape("a < b")  # 'a &lt; b'
+    """
+
+    __slots__ = ("table", "_steps", "_chars")
+
+    #: below this length one set check beats probing every special char
+    SHORT = 64
+
+    def __init__(self, table: Mapping[str, str]) -> None:
+        if any(len(char) != 1 for char in table):
+            raise ValueError("Escaper table keys must be single characters")
+
+        self.table = dict(table)
+        self._steps = tuple((char, self.table[char]) for char in self._order())
+        self._chars = frozenset(self.table)
+
+    def _order(self) -> List[str]:
+        # a char used inside another char's replacement must be replaced first,
+        # otherwise it would be escaped twice
+        order: List[str] = []
+        visiting: set[str] = set()
+
+        def visit(char: str) -> None:
+            if char in order:
+                return
+            if char in visiting:
+                raise ValueError(f"Circular escape table at {char!r}")
+            visiting.add(char)
+            for dep in self.table[char]:
+                if dep != char and dep in self.table:
+                    visit(dep)
+            visiting.discard(char)
+            order.append(char)
+
+        for char in self.table:
+            visit(char)
+        return order
+
+    def __call__(self, text: str) -> str:
+        if len(text) < self.SHORT and self._chars.isdisjoint(text):
+            return text
+        for char, replacement in self._steps:
+            if char in text:
+                text = text.replace(char, replacement)
+        return text
+
+    def many(self, texts: Iterable[str]) -> List[str]:
+        """Escape every string in `texts`."""
+        return [self(text) for text in texts]
+
+    def mapping(self, data: Mapping[K, object]) -> Dict[K, object]:
+        """Escape the string values of `data`; other values are kept as is."""
+        return {
+            key: self(value) if isinstance(value, str) else value
+            for key, value in data.items()
+        }
+
+
+def _backslash_table(chars: str) -> Dict[str, str]:
+    return {char: f"\\{char}" for char in chars}
+
+
+md_escaper = Escaper(_backslash_table(r'\_*[]()#<>`+-|{}.!'))
+md_v2_escaper = Escaper(_backslash_table(r'_*[]()~`>#+-=|{}.!'))
+html_escaper = Escaper({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#39;',
+})
+
 
 
 # ==============______ MARKDOWN______===========================================================================================  MARKDOWN
 async def escape_md(text):
     """
     Escape all standard Markdown-specific characters so they are treated as regular text.
-    
+
+    Kept async for backward compatibility; `md_escaper(text)` is the sync equivalent.
+
     Args:
         text (str): The input text to be escaped.
-    
+
     Returns:
         str: The escaped text.
     """
-    escape_chars = r'\_*[]()#<>`+-|{}.!'
-    escaped_text = ''.join(f'\\{char}' if char in escape_chars else char for char in text)
-    return escaped_text
+    return md_escaper(text)
 
 
 
@@ -21,38 +110,27 @@ async def escape_md(text):
 def escape_md_v2(text):
     """
     Escape all Markdown V2-specific characters so they are treated as regular text.
-    
+
     Args:
         text (str): The input text to be escaped.
-    
+
     Returns:
         str: The escaped text.
     """
-    escape_chars = r'_*[]()~`>#+-=|{}.!'
-    # Escape Markdown V2 restricted characters
-    text = str(text)
-    escaped_text = ''.join(f'\\{char}' if char in escape_chars else char for char in text)
-    return escaped_text
+    return md_v2_escaper(str(text))
 
 
 # ==============______ HTML______===========================================================================================  HTML
 async def escape_html(text):
     """
     Escape special HTML characters so they are treated as regular text.
-    
+
+    Kept async for backward compatibility; `html_escaper(text)` is the sync equivalent.
+
     Args:
         text (str): The input text to be escaped.
-    
+
     Returns:
         str: The escaped text.
     """
-    # Replace common HTML special characters with their entity equivalents
-    html_escape_mapping = {
-        '&': '&amp;',
-        '<': '&lt;',
-        '>': '&gt;',
-        '"': '&quot;',
-        "'": '&#39;',
-    }
-    escaped_text = ''.join(html_escape_mapping.get(char, char) for char in text)
-    return escaped_text
+    return html_escaper(text)
@@ -0,0 +1,219 @@
+"""
+Entity-based formatting for Telegram
+(b | i | s | u | code | pre | link | mention | spoiler | text)
+
+Mirrors the `md_v2` / `html` helpers, but builds plain text plus a list of
+`MessageEntity` objects instead of markup. Nothing needs escaping and
+Telegram has nothing to parse, so "can't parse entities" cannot happen.
+Offsets and lengths are in UTF-16 code units.
+
+Example:
+    msg = text("Order ", b(order_id), " for ", mention(name, user_id))
+    await bot.send_message(chat_id, **msg.as_kwargs())
+
+    for chunk in msg.split():
+        await bot.send_message(chat_id, **chunk.as_kwargs())
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+from aiogram.types import MessageEntity
+
+from ... import long_msg
+from ..split import utf16_head, utf16_len
+
+# (type, offset, length, extra fields)
+_Entity = Tuple[str, int, int, Dict[str, Any]]
+
+
+class Fragment:
+    """Plain text with entities relative to its start."""
+
+    __slots__ = ("text", "size", "entities")
+
+    def __init__(self, text: str = "", entities: List[_Entity] | None = None) -> None:
+        self.text = text
+        self.size = utf16_len(text)
+        self.entities: List[_Entity] = entities or []
+
+    def __add__(self, other: "Fragment | str") -> "Fragment":
+        return text(self, other)
+
+    def __radd__(self, other: str) -> "Fragment":
+        return text(other, self)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __repr__(self) -> str:
+        return f"Fragment({self.text!r}, {self.entities!r})"
+
+    def message_entities(self) -> List[MessageEntity]:
+        return [
+            MessageEntity(type=type_, offset=offset, length=length, **extra)
+            for type_, offset, length, extra in sorted(self.entities, key=lambda e: (e[1], -e[2]))
+        ]
+
+    def as_kwargs(self, text_key: str = "text", entities_key: str = "entities") -> Dict[str, Any]:
+        """
+        Arguments for `send_message` and friends.
+
+        Use `text_key="caption", entities_key="caption_entities"` for media.
+        """
+        return {
+            text_key: self.text,
+            entities_key: self.message_entities(),
+            "parse_mode": None,
+        }
+
+    def split(self, max_len: int = 4096) -> List["Fragment"]:
+        """
+        Split into fragments of at most `max_len` UTF-16 units.
+
+        Same rules as `safe_long_msg`: break markers (`BR`) are preferred
+        split points and are removed, oversized segments are hard split.
+        Entities crossing a boundary are cut in two and rebased.
+        """
+        if max_len <= 0:
+            raise ValueError("max_len must be positive")
+
+        segments, entities = self._strip_br()
+
+        # (start, end) UTF-16 ranges of the BR-free text, plus chunk text
+        chunks: List[Tuple[int, int, str]] = []
+        current: List[str] = []
+        current_start = current_size = 0
+        pos = 0
+
+        for segment in segments:
+            size = utf16_len(segment)
+
+            # Hard split if a single segment is too large
+            while size > max_len:
+                if current_size:
+                    chunks.append((current_start, current_start + current_size, "".join(current)))
+                    current, current_size = [], 0
+                head, segment = utf16_head(segment, max_len)
+                if not head:
+                    # max_len == 1 and a surrogate pair: cannot split further
+                    head, segment = segment[0], segment[1:]
+                head_size = utf16_len(head)
+                chunks.append((pos, pos + head_size, head))
+                pos += head_size
+                size -= head_size
+
+            if not current_size:
+                current, current_start, current_size = [segment], pos, size
+            elif current_size + size <= max_len:
+                current.append(segment)
+                current_size += size
+            else:
+                chunks.append((current_start, current_start + current_size, "".join(current)))
+                current, current_start, current_size = [segment], pos, size
+            pos += size
+
+        if current_size:
+            chunks.append((current_start, current_start + current_size, "".join(current)))
+
+        fragments: List[Fragment] = []
+        for start, end, chunk in chunks:
+            chunk_entities: List[_Entity] = []
+            for type_, offset, length, extra in entities:
+                lo, hi = max(offset, start), min(offset + length, end)
+                if lo < hi:
+                    chunk_entities.append((type_, lo - start, hi - lo, extra))
+            fragments.append(Fragment(chunk, chunk_entities))
+        return fragments
+
+    def _strip_br(self) -> Tuple[List[str], List[_Entity]]:
+        """Split the text at break markers and move entities over them."""
+        br = long_msg.BR
+        if not br or br not in self.text:
+            return [self.text], list(self.entities)
+
+        segments = self.text.split(br)
+        br_size = utf16_len(br)
+
+        # original UTF-16 offsets where each marker starts
+        markers: List[int] = []
+        pos = 0
+        for segment in segments[:-1]:
+            pos += utf16_len(segment)
+            markers.append(pos)
+            pos += br_size
+
+        def shift(offset: int) -> int:
+            before = bisect_left(markers, offset)
+            # an offset inside a marker snaps to the marker's start
+            if before and offset < markers[before - 1] + br_size:
+                return markers[before - 1] - br_size * (before - 1)
+            return offset - br_size * before
+
+        entities: List[_Entity] = []
+        for type_, offset, length, extra in self.entities:
+            start, end = shift(offset), shift(offset + length)
+            if end > start:
+                entities.append((type_, start, end - start, extra))
+        return segments, entities
+
+
+def _wrap(content: "Fragment | str", type_: str, **extra: Any) -> Fragment:
+    inner = content if isinstance(content, Fragment) else Fragment(str(content))
+    return Fragment(inner.text, [(type_, 0, inner.size, extra), *inner.entities])
+
+
+def text(*parts: "Fragment | str") -> Fragment:
+    """Concatenate strings and fragments."""
+    pieces: List[str] = []
+    entities: List[_Entity] = []
+    offset = 0
+    for part in parts:
+        if isinstance(part, Fragment):
+            entities.extend((t, o + offset, ln, x) for t, o, ln, x in part.entities)
+            pieces.append(part.text)
+            offset += part.size
+        else:
+            part = str(part)
+            pieces.append(part)
+            offset += utf16_len(part)
+    return Fragment("".join(pieces), entities)
+
+
+def b(content: "Fragment | str") -> Fragment:
+    """Wraps content with BOLD entity."""
+    return _wrap(content, "bold")
+
+def i(content: "Fragment | str") -> Fragment:
+    """Wraps content with ITALIC entity."""
+    return _wrap(content, "italic")
+
+def s(content: "Fragment | str") -> Fragment:
+    """Wraps content with STRIKETHROUGH entity."""
+    return _wrap(content, "strikethrough")
+
+def u(content: "Fragment | str") -> Fragment:
+    """Wraps content with UNDERLINE entity."""
+    return _wrap(content, "underline")
+
+def code(content: "Fragment | str") -> Fragment:
+    """Wraps content with INLINE CODE entity."""
+    return _wrap(content, "code")
+
+def pre(content: "Fragment | str", language: str = "") -> Fragment:
+    """Wraps content with CODE BLOCK entity, optionally with a language."""
+    if language:
+        return _wrap(content, "pre", language=language)
+    return _wrap(content, "pre")
+
+def link(label: "Fragment | str", url: str) -> Fragment:
+    """Creates a link with specified label and URL."""
+    return _wrap(label, "text_link", url=url)
+
+def mention(label: "Fragment | str", user_id: int) -> Fragment:
+    """Creates a mention with specified label and user ID."""
+    return _wrap(label, "text_link", url=f"tg://user?id={user_id}")
+
+def spoiler(content: "Fragment | str") -> Fragment:
+    """Wraps content with SPOILER entity."""
+    return _wrap(content, "spoiler")
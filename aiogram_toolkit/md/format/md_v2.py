@@ -4,6 +4,9 @@ MARKDOWN_V2 wrapper functions for Telegram
 Reference: https://core.telegram.org/bots/api#markdownv2-style
 """
 
+from ..escape import md_v2_escaper
+
+
 def b(string: str, escape: bool = False) -> str:
     """Wraps string with BOLD entity."""
     return f"*{escape_string(string) if escape else string}*"
@@ -58,7 +61,5 @@ def escape_string(string: str='', for_link: bool = False) -> str:
     Escapes special characters for Markdown V2 formatting.
     If `for_link` is True, parentheses are escaped as well.
     """
-    special_chars = r"_*[]()~`>#+-=|{}.!"
-    if for_link:
-        special_chars += "()"
-    return "".join(f"\\{char}" if char in special_chars else char for char in string)
+    # parentheses are already part of the MarkdownV2 table
+    return md_v2_escaper(string)
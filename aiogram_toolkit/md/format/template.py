@@ -0,0 +1,185 @@
+"""
+Compiled message templates for MARKDOWN_V2 and HTML
+(parse once, escape only the dynamic values on every render)
+
+Template syntax is `str.format` with typed placeholders. Literal text is
+plain text and is escaped once, at compile time:
+
+    {name}            escaped text
+    {name:raw}        inserted as is (already formatted markup)
+    {name:b}          bold; also i | s | u | spoiler, chainable: {name:b+i}
+    {name:code}       inline code
+    {name:pre=lang}   code block, language optional
+    {name:link}       value is (label, url)
+    {name:mention}    value is (label, user_id)
+
+Example:
+    ORDER = template("Order {id:b} for {user:mention}\\nTotal: {total:code}")
+    ORDER.md_v2(id=42, user=("Ann", 123), total="9.99 $")
+    ORDER.html(id=42, user=("Ann", 123), total="9.99 $")
+"""
+
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Callable, Dict, List, Tuple
+
+from aiogram.enums.parse_mode import ParseMode
+
+from ..escape import Escaper, html_escaper
+from ..split import _join_markers
+
+
+# MarkdownV2 also requires "\" itself to be escaped
+_md_v2_text = Escaper({char: f"\\{char}" for char in r'\_*[]()~`>#+-=|{}.!'})
+_md_v2_code = Escaper({"`": "\\`", "\\": "\\\\"})
+_md_v2_url = Escaper({")": "\\)", "\\": "\\\\"})
+
+_WRAPPERS: Dict[str, Dict[str, Tuple[str, str]]] = {
+    ParseMode.MARKDOWN_V2: {
+        "b": ("*", "*"),
+        "i": ("_", "_"),
+        "s": ("~", "~"),
+        "u": ("__", "__"),
+        "spoiler": ("||", "||"),
+    },
+    ParseMode.HTML: {
+        "b": ("<b>", "</b>"),
+        "i": ("<i>", "</i>"),
+        "s": ("<s>", "</s>"),
+        "u": ("<u>", "</u>"),
+        "spoiler": ('<span class="tg-spoiler">', "</span>"),
+    },
+}
+_TERMINALS = ("text", "raw", "code", "pre", "link", "mention")
+
+Render = Callable[[Any], str]
+
+
+def _terminal(parse_mode: str, kind: str, arg: str) -> Render:
+    if parse_mode == ParseMode.MARKDOWN_V2:
+        esc = _md_v2_text
+        if kind == "code":
+            return lambda v: f"`{_md_v2_code(str(v))}`"
+        if kind == "pre":
+            return lambda v: f"```{arg}\n{_md_v2_code(str(v))}\n```"
+        if kind == "link":
+            return lambda v: f"[{esc(str(v[0]))}]({_md_v2_url(str(v[1]))})"
+        if kind == "mention":
+            return lambda v: f"[{esc(str(v[0]))}](tg://user?id={int(v[1])})"
+    else:
+        esc = html_escaper
+        if kind == "code":
+            return lambda v: f"<code>{esc(str(v))}</code>"
+        if kind == "pre":
+            lang_attr = f' class="language-{esc(arg)}"' if arg else ""
+            return lambda v: f"<pre><code{lang_attr}>{esc(str(v))}</code></pre>"
+        if kind == "link":
+            return lambda v: f'<a href="{esc(str(v[1]))}">{esc(str(v[0]))}</a>'
+        if kind == "mention":
+            return lambda v: f'<a href="tg://user?id={int(v[1])}">{esc(str(v[0]))}</a>'
+
+    if kind == "raw":
+        return str
+    return lambda v: esc(str(v))
+
+
+class _Field:
+    __slots__ = ("name", "wrappers", "kind", "arg")
+
+    def __init__(self, name: str, spec: str) -> None:
+        if not name.isidentifier():
+            raise ValueError(f"Template fields must be plain names, got {name!r}")
+
+        self.name = name
+        self.wrappers: List[str] = []
+        self.kind, self.arg = "text", ""
+
+        styles = spec.split("+") if spec else []
+        for idx, style in enumerate(styles):
+            style, _, arg = style.partition("=")
+            if style in _WRAPPERS[ParseMode.HTML] and not arg:
+                self.wrappers.append(style)
+            elif style in _TERMINALS and idx == len(styles) - 1:
+                self.kind, self.arg = style, arg
+            else:
+                raise ValueError(f"Invalid template spec {spec!r} for field {name!r}")
+
+    def compile(self, parse_mode: str) -> Render:
+        inner = _terminal(parse_mode, self.kind, self.arg)
+        if not self.wrappers:
+            return inner
+
+        pairs = [_WRAPPERS[parse_mode][w] for w in self.wrappers]
+        opener = _join_markers([o for o, _ in pairs])
+        closer = _join_markers([c for _, c in reversed(pairs)])
+        return lambda v: f"{opener}{inner(v)}{closer}"
+
+
+class Template:
+    """
+    A message template parsed once and compiled per parse mode on first use.
+
+    Rendering only escapes and joins the dynamic values.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self._items: List[Tuple[str, _Field | None]] = []
+        for literal, name, spec, conversion in Formatter().parse(source):
+            if conversion:
+                raise ValueError(f"Conversions are not supported: {{{name}!{conversion}}}")
+            self._items.append((literal, _Field(name, spec) if name is not None else None))
+        self._compiled: Dict[str, Tuple[Tuple[str, str | None, Render | None], ...]] = {}
+
+    @property
+    def fields(self) -> List[str]:
+        return [field.name for _, field in self._items if field is not None]
+
+    def _compile(self, parse_mode: str):
+        esc = _md_v2_text if parse_mode == ParseMode.MARKDOWN_V2 else html_escaper
+        ops = []
+        pending = ""
+        for literal, field in self._items:
+            pending += esc(literal)
+            if field is not None:
+                ops.append((pending, field.name, field.compile(parse_mode)))
+                pending = ""
+        ops.append((pending, None, None))
+        compiled = self._compiled[parse_mode] = tuple(ops)
+        return compiled
+
+    def render(self, parse_mode: ParseMode | str, **values: Any) -> str:
+        """
+        Render with `values`.
+
+        Raises:
+            ValueError: If the parse mode is not MARKDOWN_V2 or HTML.
+            KeyError: If a field value is missing.
+        """
+        return self._render(parse_mode, values)
+
+    def md_v2(self, **values: Any) -> str:
+        return self._render(ParseMode.MARKDOWN_V2, values)
+
+    def html(self, **values: Any) -> str:
+        return self._render(ParseMode.HTML, values)
+
+    def _render(self, parse_mode: str, values: Dict[str, Any]) -> str:
+        ops = self._compiled.get(parse_mode)
+        if ops is None:
+            if parse_mode not in _WRAPPERS:
+                raise ValueError(f"Unsupported parse mode: {parse_mode!r}")
+            ops = self._compile(parse_mode)
+
+        parts = []
+        for literal, name, render in ops:
+            parts.append(literal)
+            if render is not None:
+                parts.append(render(values[name]))
+        return "".join(parts)
+
+
+@lru_cache(maxsize=512)
+def template(source: str) -> Template:
+    """Return the cached compiled `Template` for `source`."""
+    return Template(source)
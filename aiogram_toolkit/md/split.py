@@ -0,0 +1,454 @@
+"""
+Formatting-aware splitting of MarkdownV2 and HTML messages.
+
+A single-pass tokenizer turns the markup into text runs, atoms (escapes,
+HTML entities, links) and entity open/close markers. Chunks are then cut
+only between tokens: entities still open at a boundary are closed at the
+end of the chunk and reopened at the start of the next one, so every
+chunk parses on its own.
+
+Break markers (`long_msg.BR`) are preferred split points, exactly as in
+`safe_long_msg`. Lengths are measured in UTF-16 code units and include the
+markup, so a chunk also stays within the limit if it has to be resent as
+plain text.
+
+Example:
+    parts = split_formatted(text, ParseMode.MARKDOWN_V2)
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Tuple
+
+from aiogram.enums.parse_mode import ParseMode
+
+from .. import long_msg
+
+
+# part kinds
+TEXT = 0     # splittable run of plain characters
+ATOM = 1     # unsplittable text: escape, HTML entity, link
+OPEN = 2
+CLOSE = 3
+BR = 4       # preferred break point, produces no output
+REOPEN = 5   # openers repeated at the start of a continuation chunk
+
+
+class _Entity(NamedTuple):
+    name: str
+    opener: str
+    closer: str
+
+
+Stack = Tuple[_Entity, ...]
+
+
+class _Part(NamedTuple):
+    text: str
+    size: int
+    kind: int
+    stack: Stack  # entities open after this part
+
+
+def utf16_len(text: str) -> int:
+    """Length of `text` as Telegram counts it (UTF-16 code units)."""
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-16-le")) // 2
+
+
+def utf16_head(text: str, limit: int) -> Tuple[str, str]:
+    """Split `text` so the head is at most `limit` UTF-16 units long."""
+    if text.isascii():
+        return text[:limit], text[limit:]
+
+    size = 0
+    for idx, char in enumerate(text):
+        size += 2 if ord(char) > 0xFFFF else 1
+        if size > limit:
+            return text[:idx], text[idx:]
+    return text, ""
+
+
+def _join_markers(markers: List[str]) -> str:
+    # MarkdownV2 reads "___" greedily as "__" + "_"; an ignored "\r"
+    # keeps adjacent italic/underline markers apart
+    text = ""
+    for marker in markers:
+        if text.endswith("_") and marker.startswith("_"):
+            text += "\r"
+        text += marker
+    return text
+
+
+@lru_cache(maxsize=1024)
+def _closers(stack: Stack) -> Tuple[str, int]:
+    text = _join_markers([e.closer for e in reversed(stack)])
+    return text, utf16_len(text)
+
+
+def _tail(last: str, stack: Stack) -> Tuple[str, int]:
+    """Closers to append after `last`, separated from it if needed."""
+    text, size = _closers(stack)
+    if last.endswith("_") and text.startswith("_"):
+        return "\r" + text, size + 1
+    return text, size
+
+
+@lru_cache(maxsize=1024)
+def _openers(stack: Stack) -> Tuple[str, int]:
+    # a blockquote marker is only valid at the start of a line
+    ordered = [e for e in stack if e.name == "blockquote"]
+    ordered += [e for e in stack if e.name != "blockquote"]
+    text = _join_markers([e.opener for e in ordered])
+    if text.endswith("_"):
+        text += "\r"
+    return text, utf16_len(text)
+
+
+def _innermost(stack: Stack) -> int:
+    """Index of the innermost entity a marker can close (quotes end with the line)."""
+    for idx in range(len(stack) - 1, -1, -1):
+        if stack[idx].name != "blockquote":
+            return idx
+    return -1
+
+
+def _toggle(stack: Stack, name: str, marker: str) -> _Part:
+    # like Telegram, a marker only closes the innermost entity; otherwise
+    # it opens a nested one, even of the same type
+    idx = _innermost(stack)
+    if idx != -1 and stack[idx].name == name:
+        stack = stack[:idx] + stack[idx + 1:]
+        return _Part(marker, len(marker), CLOSE, stack)
+    stack += (_Entity(name, marker, marker),)
+    return _Part(marker, len(marker), OPEN, stack)
+
+
+# ==============______MARKDOWN V2______=========================================================================================== MARKDOWN V2
+_MD_V2_TOGGLES = {"*": "bold", "~": "strikethrough"}
+_PRE_LANGUAGE = re.compile(r"```([\w+#.-]*)\n")
+
+
+@lru_cache(maxsize=8)
+def _md_v2_patterns(br: str) -> Tuple["re.Pattern[str]", "re.Pattern[str]"]:
+    br = re.escape(br)
+    return (
+        re.compile(rf"{br}|[\\*_~|`\[!>\n]"),
+        re.compile(rf"{br}|[\\`]"),
+    )
+
+
+def _link_end(text: str, start: int) -> int:
+    """Index past `[label](url)` starting at `start`, or -1."""
+    n = len(text)
+    j = start
+    while j < n and text[j] != "]":
+        j += 2 if text[j] == "\\" else 1
+    if j + 1 >= n or text[j + 1] != "(":
+        return -1
+    k = j + 2
+    while k < n and text[k] != ")":
+        k += 2 if text[k] == "\\" else 1
+    return k + 1 if k < n else -1
+
+
+def _tokenize_md_v2(text: str, br: str) -> Iterator[_Part]:
+    special, code_special = _md_v2_patterns(br)
+    stack: Stack = ()
+    line_start = True
+    i, n = 0, len(text)
+
+    while i < n:
+        top = stack[-1].name if stack else None
+        in_code = top == "code" or top == "pre"
+
+        m = (code_special if in_code else special).search(text, i)
+        j = m.start() if m else n
+        if j > i:
+            run = text[i:j]
+            yield _Part(run, utf16_len(run), TEXT, stack)
+            line_start = run[-1] == "\n"
+            i = j
+            if m is None:
+                break
+
+        if text.startswith(br, i):
+            yield _Part("", 0, BR, stack)
+            i += len(br)
+            continue
+
+        c = text[i]
+
+        if c == "\\":
+            atom = text[i:i + 2]
+            yield _Part(atom, utf16_len(atom), ATOM, stack)
+            i += len(atom)
+            line_start = False
+            continue
+
+        if in_code:
+            if top == "code":
+                stack = stack[:-1]
+                yield _Part("`", 1, CLOSE, stack)
+                i += 1
+            elif text.startswith("```", i):
+                stack = stack[:-1]
+                yield _Part("```", 3, CLOSE, stack)
+                i += 3
+            else:
+                # kept with the next character: a chunk ending in "`" would
+                # run into the appended "```" closer
+                if text.startswith(br, i + 1):
+                    atom = "`"
+                else:
+                    atom = text[i:i + (3 if text.startswith("\\", i + 1) else 2)]
+                yield _Part(atom, utf16_len(atom), ATOM, stack)
+                i += len(atom)
+            line_start = False
+            continue
+
+        if c == "\n":
+            # a quote only spans its own line
+            stack = tuple(e for e in stack if e.name != "blockquote")
+            yield _Part("\n", 1, TEXT, stack)
+            line_start = True
+            i += 1
+            continue
+
+        step = 0
+        if line_start and (c == ">" or text.startswith("**>", i)):
+            marker = ">" if c == ">" else "**>"
+            # reopened as written: only "**>" lets a trailing "||" end the quote
+            stack += (_Entity("blockquote", marker, ""),)
+            part = _Part(marker, len(marker), OPEN, stack)
+        elif c == "_":
+            if text.startswith("__", i):
+                part = _toggle(stack, "underline", "__")
+            else:
+                part = _toggle(stack, "italic", "_")
+        elif c in _MD_V2_TOGGLES:
+            part = _toggle(stack, _MD_V2_TOGGLES[c], c)
+        elif c == "|" and text.startswith("||", i):
+            at_line_end = i + 2 == n or text[i + 2] == "\n"
+            idx = _innermost(stack)
+            in_spoiler = idx != -1 and stack[idx].name == "spoiler"
+            expandable = any(e.name == "blockquote" and e.opener == "**>" for e in stack)
+            if expandable and at_line_end and not in_spoiler:
+                # end of an expandable blockquote
+                part = _Part("||", 2, ATOM, stack)
+            else:
+                part = _toggle(stack, "spoiler", "||")
+        elif c == "`":
+            lang = _PRE_LANGUAGE.match(text, i)
+            if lang:
+                opener = lang.group(0)
+            elif text.startswith("```", i):
+                opener = "```"
+            else:
+                opener = "`"
+            name = "code" if opener == "`" else "pre"
+            stack += (_Entity(name, opener, opener[:3] if name == "pre" else "`"),)
+            part = _Part(opener, utf16_len(opener), OPEN, stack)
+        elif c == "[" or text.startswith("![", i):
+            end = _link_end(text, i + (c == "!") + 1)
+            if end == -1:
+                part = _Part(c, 1, TEXT, stack)
+            else:
+                atom = text[i:end].replace(br, "")
+                part = _Part(atom, utf16_len(atom), ATOM, stack)
+                step = end - i
+        else:
+            part = _Part(c, 1, TEXT, stack)
+
+        stack = part.stack
+        yield part
+        i += step or len(part.text)
+        line_start = False
+
+
+# ==============______ HTML______===========================================================================================  HTML
+_HTML_TAG = re.compile(r"<(/?)([a-zA-Z][\w-]*)[^<>]*>")
+_HTML_ENTITY = re.compile(r"&(#\d+|#x[0-9a-fA-F]+|[a-zA-Z]+);")
+
+
+@lru_cache(maxsize=8)
+def _html_pattern(br: str) -> "re.Pattern[str]":
+    return re.compile(rf"{re.escape(br)}|[<&]")
+
+
+def _tokenize_html(text: str, br: str) -> Iterator[_Part]:
+    special = _html_pattern(br)
+    stack: Stack = ()
+    i, n = 0, len(text)
+
+    while i < n:
+        m = special.search(text, i)
+        j = m.start() if m else n
+        if j > i:
+            run = text[i:j]
+            yield _Part(run, utf16_len(run), TEXT, stack)
+            i = j
+            if m is None:
+                break
+
+        if text.startswith(br, i):
+            yield _Part("", 0, BR, stack)
+            i += len(br)
+            continue
+
+        if text[i] == "<" and (tag := _HTML_TAG.match(text, i)):
+            raw, name = tag.group(0), tag.group(2).lower()
+            if tag.group(1):
+                for idx in range(len(stack) - 1, -1, -1):
+                    if stack[idx].name == name:
+                        stack = stack[:idx] + stack[idx + 1:]
+                        break
+                kind = CLOSE
+            else:
+                stack += (_Entity(name, raw, f"</{name}>"),)
+                kind = OPEN
+            yield _Part(raw, utf16_len(raw), kind, stack)
+            i += len(raw)
+        elif text[i] == "&" and (entity := _HTML_ENTITY.match(text, i)):
+            yield _Part(entity.group(0), len(entity.group(0)), ATOM, stack)
+            i = entity.end()
+        else:
+            yield _Part(text[i], 1, TEXT, stack)
+            i += 1
+
+
+# ==============______ CHUNKING______===========================================================================================  CHUNKING
+class _Chunker:
+    def __init__(self, max_len: int) -> None:
+        self.max_len = max_len
+        self.chunks: List[str] = []
+        self.parts: List[_Part] = []
+        self.size = 0
+        self.last_br = -1
+
+    def feed(self, part: _Part) -> None:
+        queue = deque((part,))
+        while queue:
+            part = queue.popleft()
+
+            if part.kind == BR:
+                self.parts.append(part)
+                self.last_br = len(self.parts)
+                continue
+
+            room = self.max_len - self.size - _tail(part.text, part.stack)[1]
+            if part.size <= room:
+                self.parts.append(part)
+                self.size += part.size
+                continue
+
+            cut = self._br_cut()
+            if cut is None and part.kind == TEXT and room > 0:
+                head, tail = utf16_head(part.text, room)
+                if head:
+                    self.parts.append(part._replace(text=head, size=utf16_len(head)))
+                    part = part._replace(text=tail, size=utf16_len(tail))
+                    cut = len(self.parts)
+            if cut is None:
+                cut = self._valid_cut(len(self.parts))
+            if cut is None:
+                raise ValueError(
+                    f"Cannot fit {part.text[:30]!r} into a chunk of max_len={self.max_len}"
+                )
+
+            queue.extendleft(reversed(self._emit(cut, part)))
+
+    def finish(self) -> List[str]:
+        if self._has_content(len(self.parts)):
+            self.chunks.append("".join(p.text for p in self.parts))
+        self.parts = []
+        return self.chunks
+
+    def _has_content(self, cut: int) -> bool:
+        return any(p.kind <= ATOM and p.text for p in self.parts[:cut])
+
+    def _valid_cut(self, cut: int) -> int | None:
+        # never leave an empty entity at the end of a chunk, nor an
+        # expandable quote end that closers would push off its line end
+        while cut > 0 and (
+            self.parts[cut - 1].kind in (OPEN, BR)
+            or (self.parts[cut - 1].kind == ATOM and self.parts[cut - 1].text == "||"
+                and _closers(self.parts[cut - 1].stack)[1])
+        ):
+            cut -= 1
+        return cut if self._has_content(cut) else None
+
+    def _br_cut(self) -> int | None:
+        if self.last_br < 0:
+            return None
+        cut = self.last_br
+        # closing markers right after the break belong to this chunk
+        while cut < len(self.parts) and self.parts[cut].kind == CLOSE:
+            cut += 1
+        return self._valid_cut(cut)
+
+    def _emit(self, cut: int, pending: _Part) -> List[_Part]:
+        last = self.parts[cut - 1]
+        stack = last.stack
+        closers, _ = _tail(last.text, stack)
+        self.chunks.append("".join(p.text for p in self.parts[:cut]) + closers)
+
+        rest = [*self.parts[cut:], pending]
+        if rest[0].kind == OPEN and rest[0].stack[-1].name == "blockquote":
+            # a quote marker must start the line: reopen the other entities after it
+            stack = rest[0].stack
+            rest = rest[1:]
+        elif not any(e.name == "blockquote" for e in rest[0].stack):
+            # the quote ended with its line; reopened empty, its "**>" would
+            # turn a reopened "||" into the end of an expandable quote
+            stack = tuple(e for e in stack if e.name != "blockquote")
+        openers, size = _openers(stack)
+        if size + _closers(stack)[1] >= self.max_len:
+            raise ValueError(f"Entity nesting does not fit into max_len={self.max_len}")
+
+        self.parts = [_Part(openers, size, REOPEN, stack)]
+        self.size = size
+        self.last_br = -1
+        return rest
+
+
+def split_formatted(
+    text: str,
+    parse_mode: ParseMode | str,
+    max_len: int = 4096,
+) -> List[str]:
+    """
+    Split MarkdownV2 or HTML text into chunks that each parse on their own.
+
+    Prefers break markers (`BR`) like `safe_long_msg`, otherwise cuts at
+    the last token boundary that fits. Never cuts inside an escape
+    sequence, HTML tag or entity, or a link.
+
+    Args:
+        text: Input markup.
+        parse_mode: `ParseMode.MARKDOWN_V2` or `ParseMode.HTML`.
+        max_len: Maximum chunk length in UTF-16 code units, markup included.
+
+    Returns:
+        A list of chunks.
+
+    Raises:
+        ValueError: If max_len is not positive, the parse mode is not
+            supported, or a single link / nesting level cannot fit.
+    """
+    if max_len <= 0:
+        raise ValueError("max_len must be positive")
+
+    if parse_mode == ParseMode.MARKDOWN_V2:
+        tokens = _tokenize_md_v2(text, long_msg.BR)
+    elif parse_mode == ParseMode.HTML:
+        tokens = _tokenize_html(text, long_msg.BR)
+    else:
+        raise ValueError(f"Unsupported parse mode: {parse_mode!r}")
+
+    chunker = _Chunker(max_len)
+    for part in tokens:
+        chunker.feed(part)
+    return chunker.finish()
@@ -0,0 +1,231 @@
+"""
+Local MarkdownV2 / HTML validation following Telegram's parser rules.
+
+Lets `try_with_md` detect text Telegram would reject with "can't parse
+entities" before sending it, instead of paying for a failed request.
+
+Only errors Telegram is certain to raise are reported: a text that passes
+may still be rejected for other reasons, but a text that fails is never
+accepted by Telegram.
+
+Example:
+    error = validate("Price: 9.99", ParseMode.MARKDOWN_V2)
+    # MarkupError(8, "Character '.' is reserved and must be escaped")
+"""
+
+import re
+from collections import OrderedDict
+from typing import List, NamedTuple, Tuple
+
+from aiogram.enums.parse_mode import ParseMode
+
+
+class MarkupError(NamedTuple):
+    position: int  # index into the validated string
+    reason: str
+
+
+# ==============______MARKDOWN V2______=========================================================================================== MARKDOWN V2
+_MD_V2_RESERVED = frozenset("_*[]()~`>#+-=|{}.!")
+# next character that needs a closer look, outside / inside code
+_MD_V2_NEXT = re.compile(r"[\\_*\[\]()~`>#+\-=|{}.!\n]")
+_MD_V2_NEXT_CODE = re.compile(r"[\\`]")
+
+
+def _url_end(text: str, i: int) -> int:
+    """Index of the `)` closing the URL starting at `i`, or -1."""
+    n = len(text)
+    while i < n and text[i] != ")":
+        if text[i] == "\\" and i + 1 < n and 0 < ord(text[i + 1]) <= 126:
+            i += 2
+        else:
+            i += 1
+    return i if i < n else -1
+
+
+def validate_md_v2(text: str) -> MarkupError | None:
+    """
+    Check `text` against Telegram's MarkdownV2 rules.
+
+    Returns:
+        The first error, or None if Telegram will parse the text.
+    """
+    # (entity, start position)
+    stack: List[Tuple[str, int]] = []
+    quote = ""  # "", ">" or "**>" while inside a blockquote line
+    i, n = 0, len(text)
+
+    while i < n:
+        c = text[i]
+
+        if c == "\\":
+            # escapes a character in 1-126; otherwise Telegram keeps it as text
+            i += 2 if i + 1 < n and 0 < ord(text[i + 1]) <= 126 else 1
+            continue
+
+        top = stack[-1][0] if stack else None
+
+        if top == "code" or top == "pre":
+            if c == "`" and (top == "code" or text.startswith("```", i)):
+                stack.pop()
+                i += 1 if top == "code" else 3
+            else:
+                found = _MD_V2_NEXT_CODE.search(text, i + 1)
+                i = found.start() if found else n
+            continue
+
+        if c == "\n":
+            quote = ""
+            i += 1
+            continue
+
+        line_start = i == 0 or text[i - 1] == "\n"
+        if line_start and c == ">":
+            quote = quote or ">"
+            i += 1
+            continue
+        if line_start and text.startswith("**>", i):
+            quote = "**>"
+            i += 3
+            continue
+
+        if c not in _MD_V2_RESERVED:
+            found = _MD_V2_NEXT.search(text, i + 1)
+            i = found.start() if found else n
+            continue
+
+        # ---- end of the innermost entity ---------------------------------
+        if (
+            (top == "bold" and c == "*")
+            or (top == "italic" and c == "_" and not text.startswith("__", i))
+            or (top == "underline" and text.startswith("__", i))
+            or (top == "strikethrough" and c == "~")
+            or (top == "spoiler" and text.startswith("||", i))
+        ):
+            stack.pop()
+            i += 2 if top in ("underline", "spoiler") else 1
+            continue
+
+        if top in ("link", "emoji") and c == "]":
+            stack.pop()
+            if text.startswith("(", i + 1):
+                end = _url_end(text, i + 2)
+                if end == -1:
+                    return MarkupError(i + 1, "Can't find end of a URL")
+                i = end + 1
+            elif top == "emoji":
+                return MarkupError(i, "Custom emoji entity must have a URL")
+            else:
+                i += 1
+            continue
+
+        # ---- end of an expandable blockquote ----------------------------
+        if quote == "**>" and text.startswith("||", i) and (i + 2 == n or text[i + 2] == "\n"):
+            i += 2
+            continue
+
+        # ---- start of an entity ------------------------------------------
+        start = i
+        if c == "_":
+            if text.startswith("__", i):
+                entity, i = "underline", i + 2
+            else:
+                entity, i = "italic", i + 1
+        elif c == "*":
+            entity, i = "bold", i + 1
+        elif c == "~":
+            entity, i = "strikethrough", i + 1
+        elif c == "|" and text.startswith("||", i):
+            entity, i = "spoiler", i + 2
+        elif c == "[":
+            entity, i = "link", i + 1
+        elif text.startswith("![", i):
+            entity, i = "emoji", i + 2
+        elif text.startswith("```", i):
+            entity, i = "pre", i + 3
+        elif c == "`":
+            entity, i = "code", i + 1
+        else:
+            return MarkupError(i, f"Character '{c}' is reserved and must be escaped")
+
+        if entity == "link" and any(e == "link" for e, _ in stack):
+            return MarkupError(start, "Links can't be nested")
+        stack.append((entity, start))
+
+    if stack:
+        entity, start = stack[-1]
+        return MarkupError(start, f"Can't find end of {entity} entity")
+    return None
+
+
+# ==============______ HTML______===========================================================================================  HTML
+_HTML_TAGS = frozenset({
+    "a", "b", "strong", "i", "em", "s", "strike", "del", "u", "ins",
+    "span", "tg-spoiler", "tg-emoji", "code", "pre", "blockquote", "tg-time",
+})
+_HTML_TAG = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9-]*)((?:\s+[^<>]*)?)\s*>")
+
+
+def validate_html(text: str) -> MarkupError | None:
+    """
+    Check `text` against Telegram's HTML rules.
+
+    Returns:
+        The first error, or None if Telegram will parse the text.
+    """
+    stack: List[Tuple[str, int]] = []
+    i = 0
+
+    while (i := text.find("<", i)) != -1:
+        tag = _HTML_TAG.match(text, i)
+        if tag is None:
+            return MarkupError(i, "Unsupported tag or unescaped '<'")
+
+        closing, name = tag.group(1), tag.group(2).lower()
+        if closing:
+            if not stack:
+                return MarkupError(i, f"Unexpected end tag </{name}>")
+            if stack[-1][0] != name:
+                return MarkupError(i, f"Unmatched end tag: expected </{stack[-1][0]}>, found </{name}>")
+            stack.pop()
+        else:
+            if name not in _HTML_TAGS:
+                return MarkupError(i, f"Unsupported start tag <{name}>")
+            stack.append((name, i))
+        i = tag.end()
+
+    if stack:
+        name, start = stack[-1]
+        return MarkupError(start, f"Can't find end tag corresponding to <{name}>")
+    return None
+
+
+# ==============______ CACHE______===========================================================================================  CACHE
+#: How many recent payload hashes `validate()` remembers
+CACHE_SIZE = 1024
+
+_cache: "OrderedDict[Tuple[str, int], MarkupError | None]" = OrderedDict()
+
+
+def validate(text: str, parse_mode: ParseMode | str) -> MarkupError | None:
+    """
+    Validate `text` for `parse_mode`, remembering recent results by hash.
+
+    Parse modes other than MarkdownV2 and HTML are not checked.
+    """
+    if parse_mode == ParseMode.MARKDOWN_V2:
+        check = validate_md_v2
+    elif parse_mode == ParseMode.HTML:
+        check = validate_html
+    else:
+        return None
+
+    key = (str(parse_mode), hash(text))
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    error = _cache[key] = check(text)
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return error
@@ -0,0 +1,189 @@
+"""
+Cache of rendered pagination pages.
+
+Keeps the `(message_text, markup)` tuples returned by `get_paginated_page`
+keyed by list id, page and a data-version token. Flipping back and forth
+through an unchanged list is then a dict lookup. When the data changes,
+either pass a new version token (old entries simply stop matching) or call
+`invalidate()`.
+
+With `prefetch=True` the next page is rendered in the background while the
+user reads the current one.
+
+Example:
+    pages = PageCache(max_size=2048, ttl=300)
+
+    async def render(page: int):
+        ...
+        return await get_paginated_page(...)
+
+    text, markup = await pages.get_or_render(
+        "orders", page, version=orders_version, render=render,
+        prefetch=True, total_pages=total,
+    )
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set, Tuple
+
+from ..logger import logger
+
+
+Rendered = Tuple[str, Any]
+PageKey = Tuple[Hashable, int, Hashable]
+
+
+class PageCache:
+    """LRU + TTL cache of rendered pages with single-flight rendering."""
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = 300.0) -> None:
+        """
+        Args:
+            max_size: Maximum number of pages kept; least recently used go first.
+            ttl: Seconds a page stays valid, None for no expiry.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._pages: "OrderedDict[PageKey, Tuple[float, Rendered]]" = OrderedDict()
+        self._by_list: Dict[Hashable, Set[PageKey]] = {}
+        self._rendering: Dict[PageKey, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    # ---- storage -----------------------------------------------------------
+    def get(self, list_id: Hashable, page: int, version: Hashable = None) -> Rendered | None:
+        key = (list_id, page, version)
+        entry = self._pages.get(key)
+        if entry is None:
+            return None
+        expires, rendered = entry
+        if expires and time.monotonic() >= expires:
+            self._drop(key)
+            return None
+        self._pages.move_to_end(key)
+        return rendered
+
+    def put(self, list_id: Hashable, page: int, version: Hashable, rendered: Rendered) -> None:
+        key = (list_id, page, version)
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        self._pages[key] = (expires, rendered)
+        self._pages.move_to_end(key)
+        self._by_list.setdefault(list_id, set()).add(key)
+
+        while len(self._pages) > self.max_size:
+            self._drop(next(iter(self._pages)))
+
+    def _drop(self, key: PageKey) -> None:
+        self._pages.pop(key, None)
+        keys = self._by_list.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_list[key[0]]
+
+    def invalidate(self, list_id: Hashable, page: int | None = None) -> int:
+        """
+        Drop the cached pages of `list_id` (every version), or just one page.
+
+        Returns:
+            Number of pages dropped.
+        """
+        keys = [
+            key for key in self._by_list.get(list_id, ())
+            if page is None or key[1] == page
+        ]
+        for key in keys:
+            self._drop(key)
+        for key in [k for k in self._rendering if k[0] == list_id and (page is None or k[1] == page)]:
+            del self._rendering[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._pages.clear()
+        self._by_list.clear()
+        self._rendering.clear()
+
+    # ---- rendering ---------------------------------------------------------
+    def _start(
+        self,
+        list_id: Hashable,
+        page: int,
+        version: Hashable,
+        render: Callable[[int], Awaitable[Rendered]],
+    ) -> asyncio.Task:
+        key = (list_id, page, version)
+        task = self._rendering.get(key)
+        if task is not None:
+            # concurrent requests for the same page share one render
+            return task
+
+        def done(task: asyncio.Task) -> None:
+            if self._rendering.get(key) is not task:
+                return  # invalidated while rendering: the result may be stale
+            del self._rendering[key]
+            if not task.cancelled() and task.exception() is None:
+                self.put(list_id, page, version, task.result())
+
+        task = self._rendering[key] = asyncio.ensure_future(render(page))
+        task.add_done_callback(done)
+        return task
+
+    async def get_or_render(
+        self,
+        list_id: Hashable,
+        page: int,
+        version: Hashable = None,
+        *,
+        render: Callable[[int], Awaitable[Rendered]],
+        prefetch: bool = False,
+        total_pages: int | None = None,
+    ) -> Rendered:
+        """
+        Return the cached page, rendering it with `render(page)` on a miss.
+
+        Args:
+            list_id: Identifies the list (and filter) being paged.
+            page: Page number.
+            version: Data-version token; a new token misses the old entries.
+            render: Coroutine function producing `(message_text, markup)`.
+            prefetch: Also render `page + 1` in the background.
+            total_pages: Last page number; no prefetch past it.
+        """
+        rendered = self.get(list_id, page, version)
+        if rendered is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            rendered = await asyncio.shield(self._start(list_id, page, version, render))
+
+        if prefetch and (total_pages is None or page < total_pages):
+            self.prefetch(list_id, page + 1, version, render)
+        return rendered
+
+    def prefetch(
+        self,
+        list_id: Hashable,
+        page: int,
+        version: Hashable,
+        render: Callable[[int], Awaitable[Rendered]],
+    ) -> None:
+        """Render `page` in the background unless it is cached or rendering."""
+        key = (list_id, page, version)
+        if key in self._rendering or self.get(list_id, page, version) is not None:
+            return
+
+        def report(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(
+                    "Prefetch of page %s of %r failed", page, list_id, exc_info=task.exception()
+                )
+
+        self._start(list_id, page, version, render).add_done_callback(report)
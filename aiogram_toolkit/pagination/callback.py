@@ -0,0 +1,161 @@
+"""
+Stateless pagination callback data.
+
+`PageCB` carries everything a page turn needs: the list id, the page number,
+an optional keyset cursor and a short hash of the active filters. Handlers
+rebuild the page from the callback alone, so nothing is read from or
+written to FSM storage and any bot worker can serve any click.
+
+Example:
+    cb = PageCB(action=PageAction.OPEN, list_id="orders", filters=filter_hash(f))
+
+    text, markup = await get_paginated_page(..., page_cb=cb, keys=(page.first_key, page.last_key))
+
+    async def flip(event, cb: PageCB, data) -> bool:
+        page = await orders.fetch(session, cb.page, **cb.seek())
+        ...
+        return True
+
+    registry.register(PageCB, [PageAction.OPEN, PageAction.NEXT, PageAction.PREV], flip)
+"""
+
+import base64
+import hashlib
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Dict, Mapping, Tuple
+
+from aiogram.types import InlineKeyboardButton
+
+from ..deeplink_callback import BaseCB
+
+
+class PageAction(Enum):
+    OPEN = "o"  # show `page` as is (first page, or offset pagination)
+    NEXT = "n"  # page after `cursor`
+    PREV = "p"  # page before `cursor`
+
+
+class PageCB(BaseCB, prefix="pg"):
+    """
+    Pagination payload; must pack within Telegram's 64 bytes.
+
+    Keep `list_id` short: `pack()` raises ValueError when the payload is too long.
+    """
+
+    action: PageAction
+    list_id: str
+    page: int = 1
+    cursor: str = ""
+    filters: str = ""
+
+    def seek(self) -> Dict[str, Any]:
+        """`after` / `before` arguments for `KeysetPaginator.fetch()`."""
+        if not self.cursor or self.action is PageAction.OPEN:
+            return {}
+        key = decode_cursor(self.cursor)
+        return {"after": key} if self.action is PageAction.NEXT else {"before": key}
+
+    def prev(self, first_key: Tuple[Any, ...] | None = None) -> "PageCB":
+        """Payload of the previous page; `first_key` is the current page's first key."""
+        if first_key is None:
+            return self.model_copy(update={"action": PageAction.OPEN, "page": self.page - 1, "cursor": ""})
+        return self.model_copy(
+            update={"action": PageAction.PREV, "page": self.page - 1, "cursor": encode_cursor(first_key)}
+        )
+
+    def next(self, last_key: Tuple[Any, ...] | None = None) -> "PageCB":
+        """Payload of the next page; `last_key` is the current page's last key."""
+        if last_key is None:
+            return self.model_copy(update={"action": PageAction.OPEN, "page": self.page + 1, "cursor": ""})
+        return self.model_copy(
+            update={"action": PageAction.NEXT, "page": self.page + 1, "cursor": encode_cursor(last_key)}
+        )
+
+    def control_btns(
+        self,
+        keys: Tuple[Tuple[Any, ...] | None, Tuple[Any, ...] | None] = (None, None),
+        prev_text: str = "⬅️",
+        next_text: str = "➡️",
+    ) -> Tuple[InlineKeyboardButton, InlineKeyboardButton]:
+        """Prev / next buttons in the order `get_paginated_page` expects."""
+        first_key, last_key = keys
+        return (
+            InlineKeyboardButton(text=prev_text, callback_data=self.prev(first_key).pack()),
+            InlineKeyboardButton(text=next_text, callback_data=self.next(last_key).pack()),
+        )
+
+
+# ==============______CURSOR______===========================================================================================  CURSOR
+_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _b36(number: int) -> str:
+    if number < 0:
+        return "-" + _b36(-number)
+    digits = ""
+    while True:
+        number, rest = divmod(number, 36)
+        digits = _DIGITS[rest] + digits
+        if not number:
+            return digits
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def encode_cursor(key: Tuple[Any, ...]) -> str:
+    """
+    Pack a keyset key into a short callback-safe string.
+
+    Supports int, str and datetime values: ints in base 36, strings as
+    `~` + base64url, datetimes as `@` + microseconds (`!` if timezone-aware).
+
+    Raises:
+        TypeError: For other value types.
+    """
+    parts = []
+    for value in key:
+        if isinstance(value, bool) or not isinstance(value, (int, str, datetime)):
+            raise TypeError(f"Unsupported cursor value: {value!r}")
+        if isinstance(value, int):
+            parts.append(_b36(value))
+        elif isinstance(value, str):
+            parts.append("~" + _b64(value.encode()))
+        else:
+            aware = value.tzinfo is not None
+            moment = value if aware else value.replace(tzinfo=timezone.utc)
+            parts.append(("!" if aware else "@") + _b36((moment - _EPOCH) // _MICROSECOND))
+    return ",".join(parts)
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ...]:
+    """Inverse of `encode_cursor`. Aware datetimes come back in UTC."""
+    key = []
+    for part in cursor.split(","):
+        tag = part[:1]
+        if tag == "~":
+            body = part[1:]
+            key.append(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)).decode())
+        elif tag in ("@", "!"):
+            moment = _EPOCH + int(part[1:], 36) * _MICROSECOND
+            key.append(moment if tag == "!" else moment.replace(tzinfo=None))
+        else:
+            key.append(int(part, 36))
+    return tuple(key)
+
+
+def filter_hash(filters: Mapping[str, Any], size: int = 6) -> str:
+    """
+    Short stable hash of a filter set, for `PageCB.filters`.
+
+    Lets a handler check that a button still belongs to the active filters
+    (and key page caches per filter) without storing them anywhere.
+    """
+    if not filters:
+        return ""
+    raw = repr(sorted((str(k), repr(v)) for k, v in filters.items())).encode()
+    return _b64(hashlib.blake2b(raw, digest_size=size).digest())
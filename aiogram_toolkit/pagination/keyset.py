@@ -0,0 +1,253 @@
+"""
+Keyset (seek) pagination for async SQLAlchemy queries.
+
+`OFFSET n` makes the database walk and discard `n` rows, and a `COUNT(*)`
+on every page turn scans the whole result again. `KeysetPaginator` instead
+seeks past the last key of the previous page (`WHERE key > :last`), so
+every page costs the same index range scan. Totals are counted once and
+cached for `count_ttl` seconds.
+
+The result feeds `get_paginated_page` directly.
+
+Example:
+    users = KeysetPaginator(select(User).where(User.active), User.id, per_page=20)
+
+    page = await users.fetch(session, cb.page, **cb.seek())
+    text, markup = await get_paginated_page(
+        **page.page_kwargs(lambda user: {"string": user.name, "button": ...}),
+        page_cb=cb,  # prev / next buttons carry the page's first / last key
+    )
+"""
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+from ..sqla.async_.with_session.function import function_with_session
+
+
+Key = Tuple[Any, ...]
+
+
+@dataclass(slots=True)
+class KeysetPage:
+    """One page fetched by `KeysetPaginator`."""
+
+    items: List[Any]
+    page: int
+    total_pages: int
+    table_count: int
+    current_count: int
+    has_prev: bool
+    has_next: bool
+    first_key: Key | None
+    last_key: Key | None
+
+    def page_kwargs(self, build_item: Callable[[Any], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Arguments for `get_paginated_page`.
+
+        Args:
+            build_item: Turns one item into a `{"string": ..., "button": ...}` dict.
+        """
+        return {
+            "page_data": [build_item(item) for item in self.items],
+            "page": self.page,
+            "table_count": self.table_count,
+            "current_count": self.current_count,
+            "total_list_pages": self.total_pages,
+            "keys": (self.first_key, self.last_key),
+        }
+
+
+class _CachedCount:
+    __slots__ = ("ttl", "value", "expires", "lock")
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.value: int | None = None
+        self.expires = 0.0
+        self.lock = asyncio.Lock()
+
+    async def get(self, compute: Callable[[], Awaitable[int]]) -> int:
+        if self.value is not None and time.monotonic() < self.expires:
+            return self.value
+        # concurrent page turns share a single COUNT
+        async with self.lock:
+            if self.value is None or time.monotonic() >= self.expires:
+                self.value = await compute()
+                self.expires = time.monotonic() + self.ttl
+        return self.value
+
+    def invalidate(self) -> None:
+        self.expires = 0.0
+
+
+class KeysetPaginator:
+    """
+    Paginates a `select()` by seeking on an ordered, unique key.
+
+    Create one per list (and filter) and reuse it, so the cached counts are
+    shared between page turns.
+    """
+
+    def __init__(
+        self,
+        query: "Select",  # type: ignore  # noqa: F821
+        key: Any | Sequence[Any],
+        per_page: int = 20,
+        *,
+        descending: bool = False,
+        count_ttl: float = 60.0,
+        count: Callable[["AsyncSession"], Awaitable[int]] | None = None,  # type: ignore  # noqa: F821
+        table_count: Callable[["AsyncSession"], Awaitable[int]] | None = None,  # type: ignore  # noqa: F821
+        session_factory: Callable[[], "AsyncSession"] | None = None,  # type: ignore  # noqa: F821
+    ) -> None:
+        """
+        Args:
+            query: Base `select()`; must not have its own ORDER BY / LIMIT.
+            key: Column (or columns) that uniquely orders the rows, ideally
+                indexed; e.g. `User.id` or `(User.created_at, User.id)`.
+            per_page: Items per page.
+            descending: Walk the key from largest to smallest.
+            count_ttl: Seconds to reuse the counts before recounting.
+            count: Custom counter for the query's rows, e.g. a planner
+                estimate on huge tables. Defaults to an exact COUNT(*).
+            table_count: Custom counter for the whole table. Defaults to
+                COUNT(*) of the query's main table.
+            session_factory: Used when `fetch()` is called without a session.
+        """
+        if per_page <= 0:
+            raise ValueError("per_page must be positive")
+
+        self.query = query
+        self.keys = tuple(key) if isinstance(key, (tuple, list)) else (key,)
+        self.per_page = per_page
+        self.descending = descending
+        self.session_factory = session_factory
+        self._width = len(query.column_descriptions)
+        self._count_fn = count
+        self._table_count_fn = table_count
+        self._count = _CachedCount(count_ttl)
+        self._table_count = _CachedCount(count_ttl)
+
+    def invalidate_counts(self) -> None:
+        """Recount on the next fetch, e.g. after inserting or deleting rows."""
+        self._count.invalidate()
+        self._table_count.invalidate()
+
+    # ---- query building ---------------------------------------------------
+    def _seek(self, key: Key, forward: bool):
+        from sqlalchemy import tuple_
+
+        column = self.keys[0] if len(self.keys) == 1 else tuple_(*self.keys)
+        value = key[0] if len(self.keys) == 1 else tuple_(*key)
+        return column > value if forward != self.descending else column < value
+
+    def _order(self, forward: bool):
+        ascending = forward != self.descending
+        return [k.asc() if ascending else k.desc() for k in self.keys]
+
+    def _split(self, row) -> Tuple[Any, Key]:
+        item = row[0] if self._width == 1 else tuple(row[: self._width])
+        return item, tuple(row[self._width:])
+
+    async def _exact_count(self, session) -> int:
+        from sqlalchemy import func, select
+
+        subquery = self.query.order_by(None).subquery()
+        return await session.scalar(select(func.count()).select_from(subquery))
+
+    async def _exact_table_count(self, session) -> int:
+        from sqlalchemy import func, select
+
+        table = self.query.get_final_froms()[0]
+        return await session.scalar(select(func.count()).select_from(table))
+
+    # ---- fetching ----------------------------------------------------------
+    async def fetch(
+        self,
+        session: "AsyncSession | None" = None,  # type: ignore  # noqa: F821
+        page: int = 1,
+        *,
+        after: Key | None = None,
+        before: Key | None = None,
+    ) -> KeysetPage:
+        """
+        Fetch one page.
+
+        Args:
+            session: Async session; opened from `session_factory` if omitted.
+            page: Number of the page being fetched, for display.
+            after: `last_key` of the previous page (moving forward).
+            before: `first_key` of the next page (moving back).
+                With neither, the first page is fetched.
+
+        Raises:
+            ValueError: If both `after` and `before` are given, or no
+                session is available.
+        """
+        if after is not None and before is not None:
+            raise ValueError("Pass either `after` or `before`, not both")
+
+        if session is None:
+            if self.session_factory is None:
+                raise ValueError("No session given and no session_factory configured")
+            fetch = function_with_session(self.session_factory)(self._fetch)
+            return await fetch(page=page, after=after, before=before)
+        return await self._fetch(page=page, after=after, before=before, session=session)
+
+    async def _fetch(self, page: int, after: Key | None, before: Key | None, session) -> KeysetPage:
+        forward = before is None
+        cursor = after if forward else before
+
+        stmt = self.query.add_columns(*self.keys).order_by(*self._order(forward))
+        if cursor is not None:
+            stmt = stmt.where(self._seek(tuple(cursor), forward))
+        # one extra row tells whether there is more in this direction
+        rows = (await session.execute(stmt.limit(self.per_page + 1))).all()
+
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if not forward:
+            rows.reverse()
+
+        items, keys = [], []
+        for row in rows:
+            item, key = self._split(row)
+            items.append(item)
+            keys.append(key)
+
+        if forward:
+            has_prev, has_next = cursor is not None and page > 1, more
+        else:
+            has_prev, has_next = more, True
+
+        current_count = await self._count.get(
+            lambda: (self._count_fn or self._exact_count)(session)
+        )
+        table_count = await self._table_count.get(
+            lambda: (self._table_count_fn or self._exact_table_count)(session)
+        )
+
+        # counts may be stale or estimated: keep the page numbers consistent
+        # with what the seek actually found
+        total_pages = max(1, math.ceil(current_count / self.per_page))
+        if has_next:
+            total_pages = max(total_pages, page + 1)
+        else:
+            total_pages = page
+
+        return KeysetPage(
+            items=items,
+            page=page,
+            total_pages=total_pages,
+            table_count=table_count,
+            current_count=current_count,
+            has_prev=has_prev,
+            has_next=has_next,
+            first_key=keys[0] if keys else None,
+            last_key=keys[-1] if keys else None,
+        )
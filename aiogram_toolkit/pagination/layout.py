@@ -0,0 +1,119 @@
+"""
+Precompiled keyboard layout for paginated pages.
+
+`get_paginated_page` used to rebuild the whole keyboard on every call: a new
+`InlineKeyboardBuilder`, the static rows re-added and deep-copied, and the
+markup re-validated by pydantic. `PageLayout` compiles the static parts once
+(extra rows on top and bottom, and the prev / next control rows) into frozen
+rows. Rendering only slices the page's item buttons into rows and splices
+them in, building the markup without re-validation.
+
+Example:
+    ORDERS_LAYOUT = PageLayout(
+        btns_per_row=5,
+        top=[[search_btn]],
+        bottom=[[back_btn]],
+        control_btns=[prev_btn, next_btn],
+    )
+
+    text, markup = await get_paginated_page(..., layout=ORDERS_LAYOUT)
+"""
+
+from typing import List, Sequence, Tuple
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+# same limit as InlineKeyboardBuilder: longer rows are wrapped
+MAX_ROW_WIDTH = 8
+
+Row = Tuple[InlineKeyboardButton, ...]
+
+
+def _rows(buttons: Sequence[InlineKeyboardButton], width: int) -> List[Row]:
+    return [tuple(buttons[pos:pos + width]) for pos in range(0, len(buttons), width)]
+
+
+def _freeze(rows: Sequence[Sequence[InlineKeyboardButton]]) -> Tuple[Row, ...]:
+    frozen: List[Row] = []
+    for row in rows:
+        # validate once, at compile time
+        buttons = [InlineKeyboardButton.model_validate(button) for button in row]
+        frozen.extend(_rows(buttons, MAX_ROW_WIDTH))
+    return tuple(frozen)
+
+
+class PageLayout:
+    """
+    Keyboard of a paginated page, compiled once and rendered per page.
+
+    Produces the same rows as the `InlineKeyboardBuilder` path of
+    `get_paginated_page`: top rows, item buttons, prev / next, bottom rows.
+    """
+
+    __slots__ = ("btns_per_row", "top", "bottom", "_controls")
+
+    def __init__(
+        self,
+        btns_per_row: int = 6,
+        top: Sequence[Sequence[InlineKeyboardButton]] = (),
+        bottom: Sequence[Sequence[InlineKeyboardButton]] = (),
+        control_btns: Sequence[InlineKeyboardButton] = (),
+    ) -> None:
+        """
+        Args:
+            btns_per_row: Item buttons per row; rows over 8 are wrapped.
+            top: Static rows above the items.
+            bottom: Static rows below the controls.
+            control_btns: Static `(prev, next)` buttons; leave empty if they
+                change per page and pass them to `render()` instead.
+        """
+        if btns_per_row < 1:
+            raise ValueError("btns_per_row must be positive")
+
+        self.btns_per_row = btns_per_row
+        self.top = _freeze(top)
+        self.bottom = _freeze(bottom)
+        self._controls = self._compile_controls(control_btns) if control_btns else None
+
+    @staticmethod
+    def _compile_controls(control_btns: Sequence[InlineKeyboardButton]) -> Tuple[Row, Row, Row, Row]:
+        prev_btn, next_btn = _freeze([control_btns[:2]])[0]
+        # indexed by has_prev * 2 + has_next
+        return ((), (next_btn,), (prev_btn,), (prev_btn, next_btn))
+
+    def render(
+        self,
+        buttons: Sequence[InlineKeyboardButton],
+        has_prev: bool,
+        has_next: bool,
+        control_btns: Sequence[InlineKeyboardButton] = (),
+    ) -> InlineKeyboardMarkup:
+        """
+        Build the markup for one page.
+
+        Args:
+            buttons: The page's item buttons, already validated.
+            has_prev: Show the prev button.
+            has_next: Show the next button.
+            control_btns: Per-page `(prev, next)`; overrides the compiled ones.
+        """
+        if control_btns:
+            controls = ((), (control_btns[1],), (control_btns[0],), tuple(control_btns[:2]))
+        elif self._controls is not None:
+            controls = self._controls
+        else:
+            raise ValueError("No control buttons compiled or given")
+
+        rows: List[Sequence[InlineKeyboardButton]] = list(self.top)
+        if self.btns_per_row <= MAX_ROW_WIDTH:
+            rows.extend(_rows(buttons, self.btns_per_row))
+        else:
+            for row in _rows(buttons, self.btns_per_row):
+                rows.extend(_rows(row, MAX_ROW_WIDTH))
+        control_row = controls[has_prev * 2 + has_next]
+        if control_row:
+            rows.append(control_row)
+        rows.extend(self.bottom)
+
+        # every button was validated when it was created or compiled
+        return InlineKeyboardMarkup.model_construct(inline_keyboard=[list(row) for row in rows])
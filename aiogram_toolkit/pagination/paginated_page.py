@@ -1,6 +1,9 @@
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.types import InlineKeyboardButton
-from typing import List, Dict
+from typing import Any, List, Dict, Tuple
+
+from .callback import PageCB
+from .layout import PageLayout
 
 
 
@@ -15,7 +18,10 @@ async def get_paginated_page(
         list_name: str = 'Unknown Data',
         control_btns: List[InlineKeyboardButton] = [],
         extra_btns_top: List[List[InlineKeyboardButton]] = [[]], 
-        extra_btns_bottom: List[List[InlineKeyboardButton]] = [[]]
+        extra_btns_bottom: List[List[InlineKeyboardButton]] = [[]],
+        page_cb: PageCB | None = None,
+        keys: Tuple[Tuple[Any, ...] | None, Tuple[Any, ...] | None] = (None, None),
+        layout: PageLayout | None = None,
     ):
     """
     Generates a paginated page message with inline buttons based on current page data.
@@ -38,6 +44,9 @@ async def get_paginated_page(
         list_name: str - name of the list (default: 'Data').
         extra_btns_top: list - list of extra buttons to be displayed at the top (default: [[]]).
         extra_btns_bottom: list - list of extra buttons to be displayed at the bottom (default: [[]]).
+        page_cb: PageCB - if given and control_btns is empty, prev/next buttons are generated from it.
+        keys: tuple - first and last keyset keys of the page, encoded as cursors into the generated buttons.
+        layout: PageLayout - precompiled keyboard; replaces btns_per_row and the extra buttons.
     
     Returns:
         tuple: A message text and an inline keyboard for the current page.
@@ -48,12 +57,21 @@ async def get_paginated_page(
 
     header= f'{title}\n\n'[:40]
     footer = f'\n\n{title}'[:40]
+    body = "\n".join(item["string"] for item in page_data)
     message_text = (
         f"{header}"
-        f'{"\n".join(item["string"] for item in page_data)}'
+        f"{body}"
         f"{footer}"   
     )
 
+    if not control_btns and page_cb is not None:
+        control_btns = page_cb.model_copy(update={"page": page}).control_btns(keys)
+
+    if layout is not None:
+        buttons = [item['button'] for item in page_data] if page_data and page_data[0].get('button') else []
+        markup = layout.render(buttons, page > 1, page < total_list_pages, control_btns)
+        return message_text, markup
+
     markup = InlineKeyboardBuilder()
 
     # Top extra buttons
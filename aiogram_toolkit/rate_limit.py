@@ -0,0 +1,120 @@
+"""
+Async token buckets for staying under Telegram flood limits.
+
+Telegram allows roughly 30 messages per second overall and about one
+message per second in a single chat (with short bursts). `ChatRateLimiter`
+combines a global bucket with lazily created per-chat buckets.
+
+Example:
+    limiter = ChatRateLimiter()
+    await limiter.acquire(chat_id)
+    await bot.send_message(chat_id, text)
+"""
+
+import asyncio
+import time
+from typing import Dict, Hashable
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, up to `capacity`.
+
+    `acquire()` waits until a token is available; waiters are served in
+    FIFO order.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take `tokens` if available.
+
+        Returns:
+            0.0 on success, otherwise the number of seconds to wait.
+        """
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        self._refill(now)
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        async with self._lock:
+            while (delay := self.try_acquire(tokens)) > 0:
+                await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for `seconds` (e.g. after `TelegramRetryAfter`)."""
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = max(self.updated, self.paused_until)
+
+    @property
+    def idle(self) -> bool:
+        """True if the bucket is full and nobody is waiting on it."""
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity and not self._lock.locked()
+
+
+class ChatRateLimiter:
+    """
+    Global token bucket plus one bucket per chat.
+
+    Args:
+        global_rate: Messages per second across all chats.
+        chat_rate: Messages per second within one chat.
+        chat_burst: How many messages a quiet chat may receive at once.
+        max_chats: Idle per-chat buckets are dropped beyond this count.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        max_chats: int = 10_000,
+    ) -> None:
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_chats = max_chats
+        self._chats: Dict[Hashable, TokenBucket] = {}
+
+    def bucket(self, chat_id: Hashable) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_chats:
+                self._prune()
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    async def acquire(self, chat_id: Hashable) -> None:
+        await self.bucket(chat_id).acquire()
+        await self.global_bucket.acquire()
+
+    def pause(self, chat_id: Hashable, seconds: float) -> None:
+        self.bucket(chat_id).pause(seconds)
+
+    def _prune(self) -> None:
+        for chat_id in [c for c, b in self._chats.items() if b.idle]:
+            del self._chats[chat_id]
@@ -0,0 +1,192 @@
+"""
+Coalescing, rate-limited message reactions.
+
+Setting a reaction is one `setMessageReaction` call, and busy group chats
+quickly run into flood limits. `ReactionDispatcher` queues reactions instead
+of sending them inline:
+
+- only the latest reaction per message is kept; one replaced before it was
+  sent is dropped without an API call,
+- a message has at most one call in flight; a reaction queued meanwhile
+  waits for it, so calls never race and the latest reaction lands last,
+- calls go out under the per-chat and global token buckets of a
+  `ChatRateLimiter`; a flood wait pauses the chat and the reaction is retried.
+
+Example:
+    reactions = ReactionDispatcher()
+    reactions.react(bot, chat_id, message_id, Emoji.EYES)
+    reactions.react(bot, chat_id, message_id, Emoji.THUMBS_UP)  # replaces EYES
+    dp.shutdown.register(reactions.close)
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Iterable, List, Set, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import ReactionTypeEmoji
+
+from .emojis import Emoji
+from .logger import logger
+from .rate_limit import ChatRateLimiter
+
+_Key = Tuple[Bot, int | str, int]
+# (reactions, is_big)
+_Reaction = Tuple[List[ReactionTypeEmoji], bool]
+
+
+def _reaction_list(reaction: Emoji | Iterable[Emoji] | None) -> List[ReactionTypeEmoji]:
+    if reaction is None:
+        return []
+    if isinstance(reaction, Emoji):
+        return [reaction.as_reaction()]
+    return [emoji.as_reaction() for emoji in reaction]
+
+
+class ReactionDispatcher:
+    """Background queue setting message reactions, latest reaction wins."""
+
+    def __init__(
+        self,
+        limiter: ChatRateLimiter | None = None,
+        max_pending: int = 10_000,
+        max_concurrency: int = 10,
+    ) -> None:
+        """
+        Args:
+            limiter: Rate limiter; a dedicated `ChatRateLimiter()` by default.
+            max_pending: Reactions for new messages are refused beyond this.
+            max_concurrency: API calls in flight at once.
+        """
+        if max_pending <= 0 or max_concurrency <= 0:
+            raise ValueError("max_pending and max_concurrency must be positive")
+
+        self.limiter = limiter or ChatRateLimiter()
+        self.max_pending = max_pending
+
+        self._pending: "OrderedDict[_Key, _Reaction]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._sending: Set[asyncio.Task] = set()
+        self._in_flight: Set[_Key] = set()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+        self.sent = 0
+        self.superseded = 0  # reactions replaced before they were sent
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def react(
+        self,
+        bot: Bot,
+        chat_id: int | str,
+        message_id: int,
+        reaction: Emoji | Iterable[Emoji] | None,
+        is_big: bool = False,
+    ) -> bool:
+        """
+        Queue a reaction without awaiting anything; None removes reactions.
+
+        Returns:
+            False if the dispatcher is closed or full.
+        """
+        if self._closed:
+            return False
+
+        key = (bot, chat_id, message_id)
+        if key in self._pending:
+            self.superseded += 1
+        elif len(self._pending) >= self.max_pending:
+            return False
+        # replacing keeps the message's place in the queue
+        self._pending[key] = (_reaction_list(reaction), is_big)
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+        return True
+
+    async def close(self) -> None:
+        """Stop the worker, let calls in flight finish, then send what is still queued."""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+        while self._pending:
+            key, reaction = self._pending.popitem(last=False)
+            await self.limiter.acquire(key[1])
+            await self._send(key, reaction)
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._pending:
+                delay = None
+                for key in list(self._pending):
+                    if key in self._in_flight:
+                        # sent once the older call returns
+                        continue
+                    # a chat without tokens must not hold up the others
+                    wait = self.limiter.bucket(key[1]).try_acquire()
+                    if wait:
+                        delay = wait if delay is None else min(delay, wait)
+                        continue
+
+                    reaction = self._pending.pop(key)
+                    await self.limiter.global_bucket.acquire()
+                    await self._slots.acquire()
+                    self._in_flight.add(key)
+                    task = asyncio.create_task(self._send(key, reaction))
+                    self._sending.add(task)
+                    task.add_done_callback(self._sent)
+
+                if delay is None:
+                    # whatever is left waits for its call in flight to wake us
+                    break
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    def _sent(self, task: asyncio.Task) -> None:
+        self._sending.discard(task)
+        self._slots.release()
+
+    async def _send(self, key: _Key, reaction: _Reaction) -> None:
+        bot, chat_id, message_id = key
+        reactions, is_big = reaction
+        try:
+            await bot.set_message_reaction(
+                chat_id=chat_id,
+                message_id=message_id,
+                reaction=reactions,
+                is_big=is_big,
+            )
+            self.sent += 1
+        except TelegramRetryAfter as e:
+            logger.warning("Flood wait %ss for reactions in chat %s", e.retry_after, chat_id)
+            self.limiter.pause(chat_id, e.retry_after)
+            # retry unless a newer reaction was queued meanwhile
+            if key not in self._pending and not self._closed:
+                self._pending[key] = reaction
+                self._wakeup.set()
+        except Exception as e:
+            logger.debug("Setting reaction failed in chat %s: %s", chat_id, e)
+        finally:
+            self._in_flight.discard(key)
+            if key in self._pending:
+                self._wakeup.set()
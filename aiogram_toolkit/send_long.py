@@ -0,0 +1,124 @@
+"""
+Send long texts as several Telegram messages.
+
+`send_long()` splits the text with `safe_long_msg` (markup-aware for
+MarkdownV2 / HTML), then sends the chunks in order under a per-chat rate
+limiter. Flood waits are honoured transparently, and a chunk Telegram
+cannot parse is resent as plain text without affecting the others.
+
+Example:
+    await send_long(bot, chat_id, report)
+    await send_long(bot, chat_id, report, edit_message_id=progress_msg.message_id)
+"""
+
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+from aiogram import Bot
+from aiogram.enums.parse_mode import ParseMode
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import Message
+
+from .argument_shortcuts import PM
+from .logger import logger
+from .long_msg import safe_long_msg
+from .md.applier import try_with_md
+from .md.format.entities import Fragment
+from .rate_limit import ChatRateLimiter
+
+
+#: Limiter shared by all `send_long()` calls that don't pass their own
+default_limiter = ChatRateLimiter()
+
+
+def _split(
+    text: str | Fragment,
+    parse_mode: ParseMode | None,
+    max_len: int,
+) -> Tuple[List[Dict[str, Any]], ParseMode | None]:
+    # message contents of the chunks and the parse mode to send them with
+    if isinstance(text, Fragment):
+        return [chunk.as_kwargs() for chunk in text.split(max_len)], None
+
+    split_mode = parse_mode if parse_mode in (ParseMode.MARKDOWN_V2, ParseMode.HTML) else None
+    return [{"text": chunk} for chunk in safe_long_msg(text, max_len, split_mode)], parse_mode
+
+
+async def _with_retry(
+    chat_id: int | str,
+    limiter: ChatRateLimiter,
+    max_retries: int,
+    coroutine,
+    params: dict,
+    parse_mode: ParseMode | None,
+) -> Any:
+    for attempt in range(max_retries + 1):
+        await limiter.acquire(chat_id)
+        try:
+            if parse_mode is None:
+                return await coroutine(**params)
+            return await try_with_md(coroutine, params, parse_mode=parse_mode)
+        except TelegramRetryAfter as e:
+            if attempt == max_retries:
+                raise
+            logger.warning("Flood wait %ss in chat %s", e.retry_after, chat_id)
+            limiter.pause(chat_id, e.retry_after)
+            await asyncio.sleep(e.retry_after)
+
+
+async def send_long(
+    bot: Bot,
+    chat_id: int | str,
+    text: str | Fragment,
+    *,
+    parse_mode: ParseMode | None = PM,
+    max_len: int = 4096,
+    edit_message_id: int | None = None,
+    reply_markup: Any = None,
+    limiter: ChatRateLimiter | None = None,
+    max_retries: int = 3,
+    **params: Any,
+) -> List[Message | bool]:
+    """
+    Split `text` and send the chunks to `chat_id` in order.
+
+    Args:
+        bot: Bot instance.
+        chat_id: Target chat.
+        text: Message text, possibly longer than `max_len`. A `Fragment`
+            is split with its entities and sent without a parse mode.
+        parse_mode: Markup of `text`; None sends plain text.
+        max_len: Maximum chunk length (Telegram limit: 4096).
+        edit_message_id: Edit this message with the first chunk and send
+            the rest as new messages.
+        reply_markup: Attached to the last chunk only.
+        limiter: Rate limiter; defaults to the shared `default_limiter`.
+        max_retries: How many flood waits to sit out per chunk.
+        **params: Extra `send_message` arguments (not used for the edit).
+
+    Returns:
+        Results of the API calls, one per chunk.
+
+    Raises:
+        TelegramRetryAfter: If a chunk is still flood-limited after
+            `max_retries` waits.
+    """
+    limiter = limiter or default_limiter
+    contents, parse_mode = _split(text, parse_mode, max_len)
+
+    results: List[Message | bool] = []
+    for idx, content in enumerate(contents):
+        extra = {"reply_markup": reply_markup} if idx == len(contents) - 1 and reply_markup else {}
+
+        if idx == 0 and edit_message_id is not None:
+            coroutine = bot.edit_message_text
+            call_params = {"chat_id": chat_id, "message_id": edit_message_id, **content, **extra}
+        else:
+            coroutine = bot.send_message
+            call_params = {"chat_id": chat_id, **content, **params, **extra}
+
+        results.append(
+            await _with_retry(chat_id, limiter, max_retries, coroutine, call_params, parse_mode)
+        )
+
+    return results
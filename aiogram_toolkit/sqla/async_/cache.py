@@ -0,0 +1,223 @@
+"""
+Read-through cache for `function_with_session(behavior="read")`.
+
+Near-static data (settings, catalog entries, admin lists) is read on every
+call although it rarely changes. With a `QueryCache`, read functions are
+keyed by function and arguments; hits skip the session entirely, and
+concurrent misses of the same key share a single query. "write" functions
+invalidate entries by tag.
+
+Example:
+    cache = QueryCache(ttl=300)
+
+    @function_with_session(Session, cache=cache, tags=["settings"], convert=as_dicts)
+    async def get_settings(chat_id, session): ...
+
+    @function_with_session(Session, "write", cache=cache, invalidates=["settings"])
+    async def set_setting(chat_id, name, value, session): ...
+
+Arguments identify the entry by type and repr, so they must be hashable
+values with a meaningful repr (numbers, strings, enums, dates, tuples of
+them...); for anything else pass `key=` to derive such a value:
+
+    @function_with_session(Session, cache=cache, key=lambda user: user.id)
+    async def get_profile(user, session): ...
+
+Cached values are shared between callers, so treat them as read-only. ORM
+instances are cached detached from their (closed) session; pass `convert`
+to cache plain data instead, which a shared backend requires anyway.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Protocol, Set, Tuple
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+#: Returned by backends for absent or expired keys
+MISSING: Any = _Missing()
+
+
+class CacheBackend(Protocol):
+    """Storage behind `QueryCache`; implement it for a shared cache (e.g. Redis)."""
+
+    async def get(self, key: str) -> Any: ...  # value or MISSING
+
+    async def set(self, key: str, value: Any, ttl: float, tags: Tuple[str, ...]) -> None: ...
+
+    async def invalidate(self, tags: Tuple[str, ...]) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+class MemoryBackend:
+    """In-process LRU + TTL backend with a tag index."""
+
+    def __init__(self, max_size: int = 1024) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Any, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        if time.monotonic() >= entry[0]:
+            self._drop(key)
+            return MISSING
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: Any, ttl: float, tags: Tuple[str, ...]) -> None:
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._drop(next(iter(self._entries)))
+
+    async def invalidate(self, tags: Tuple[str, ...]) -> None:
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._drop(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class QueryCache:
+    """Read-through cache with single-flight misses and tag invalidation."""
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        ttl: float = 60.0,
+        max_size: int = 1024,
+    ) -> None:
+        """
+        Args:
+            backend: Storage; defaults to a `MemoryBackend(max_size)`.
+            ttl: Default seconds an entry stays valid.
+            max_size: Size of the default in-process backend.
+        """
+        self.backend = backend if backend is not None else MemoryBackend(max_size)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # key -> (in-flight load, its tags)
+        self._loading: Dict[str, Tuple[asyncio.Future, Tuple[str, ...]]] = {}
+        # bumped by invalidate(): loads started before it must not be stored
+        self._generation = 0
+
+    @staticmethod
+    def key(func: Callable, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+        """
+        Cache key of a call; arguments are identified by type and repr.
+
+        Raises TypeError for unhashable arguments and for ones with the
+        default, address-bearing repr.
+        """
+        raw = _identity((args, tuple(sorted(kwargs.items())))).encode()
+        digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        return f"{func.__module__}.{func.__qualname__}:{digest}"
+
+    async def get_or_load(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Any]],
+        tags: Iterable[str] = (),
+        ttl: float | None = None,
+    ) -> Any:
+        """Return the cached value of `key`, calling `load()` once on a miss."""
+        value = await self.backend.get(key)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        loading = self._loading.get(key)
+        if loading is None:
+            tags = tuple(tags)
+            # a fresh context: the load must not join the caller's session,
+            # only committed data belongs in the cache
+            future = asyncio.get_running_loop().create_task(
+                self._load(key, load, tags, ttl), context=contextvars.Context()
+            )
+            self._loading[key] = (future, tags)
+            future.add_done_callback(lambda _: self._forget(key, future))
+        else:
+            future = loading[0]
+        return await asyncio.shield(future)
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        loading = self._loading.get(key)
+        if loading is not None and loading[0] is future:
+            del self._loading[key]
+
+    async def _load(self, key: str, load, tags: Tuple[str, ...], ttl: float | None) -> Any:
+        generation = self._generation
+        value = await load()
+        if generation == self._generation:
+            await self.backend.set(key, value, self.ttl if ttl is None else ttl, tags)
+        return value
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying one of `tags`."""
+        self._generation += 1
+        # loads in flight may have read the old rows: later callers start anew
+        dropped = set(tags)
+        for key, (_, loading_tags) in list(self._loading.items()):
+            if dropped.intersection(loading_tags):
+                del self._loading[key]
+        await self.backend.invalidate(tags)
+
+    async def clear(self) -> None:
+        self._generation += 1
+        self._loading.clear()
+        await self.backend.clear()
+
+
+def _identity(value: Any) -> str:
+    if type(value) is tuple:
+        return "(" + ",".join(_identity(item) for item in value) + ")"
+    if type(value) is frozenset:
+        # sorted: set order varies between processes sharing a backend
+        return "{" + ",".join(sorted(_identity(item) for item in value)) + "}"
+    cls = type(value)
+    try:
+        hash(value)
+    except TypeError:
+        raise TypeError(
+            f"unhashable {cls.__qualname__} argument can't be a cache key; pass key="
+        ) from None
+    if cls.__repr__ is object.__repr__:
+        raise TypeError(
+            f"{cls.__qualname__} argument has no value repr to key the cache by; pass key="
+        )
+    return f"{cls.__module__}.{cls.__qualname__}:{value!r}"
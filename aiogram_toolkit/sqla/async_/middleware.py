@@ -0,0 +1,192 @@
+"""
+One session per update, with connection-pool metrics.
+
+`SessionMiddleware` opens (lazily) a single session for each update and
+injects it into handler data as `session`. Handlers decorated with
+`with_session` / `function_with_session` inside the update join it instead
+of opening their own ("write" functions only under a "write" handler).
+The handler flag `session` picks the behavior:
+
+    "read"   never commits (default)
+    "write"  commits after the handler, rolls back on error
+
+Flags are only visible to inner middlewares, so register it per observer:
+
+    router.message.middleware(SessionMiddleware(Session, metrics=report))
+    router.callback_query.middleware(SessionMiddleware(Session, metrics=report))
+
+    @router.message(Command("buy"), flags={"session": "write"})
+    async def buy(message: Message, session: AsyncSession): ...
+
+For each update that used the session, `metrics(SessionMetrics)` reports
+how long pool checkouts waited, how long connections were held and how
+many statements ran.
+"""
+
+import inspect
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Literal
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import TelegramObject
+
+from ...logger import logger
+from .with_session.ambient import AmbientSession, _ambient, _invalidate_committed, _joinable
+from .with_session.lazy import LazySession
+
+
+@dataclass(slots=True)
+class SessionMetrics:
+    """Database usage of one update."""
+
+    behavior: str
+    checkouts: int = 0
+    checkout_wait: float = 0.0  # seconds spent waiting for pool connections
+    hold_time: float = 0.0  # seconds connections were checked out
+    queries: int = 0
+    committed: bool = False
+    failed: bool = False
+    _acquired: float = field(default=0.0, repr=False)  # start of the current checkout
+
+
+_metrics: ContextVar[SessionMetrics | None] = ContextVar("aiogram_toolkit_session_metrics", default=None)
+
+
+# ---- SQLAlchemy hooks (attribute events to the current update) -------------
+def _timed_connect(connect: Callable[[], Any]) -> Callable[[], Any]:
+    def timed():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            metrics = _metrics.get()
+            if metrics is not None:
+                metrics.checkout_wait += time.perf_counter() - started
+
+    timed.__wrapped__ = connect
+    return timed
+
+
+def _on_checkout(dbapi_connection, record, proxy) -> None:
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics.checkouts += 1
+        metrics._acquired = time.perf_counter()
+
+
+def _on_checkin(dbapi_connection, record) -> None:
+    metrics = _metrics.get()
+    if metrics is not None and metrics._acquired:
+        metrics.hold_time += time.perf_counter() - metrics._acquired
+        metrics._acquired = 0.0
+
+
+def _on_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics.queries += 1
+
+
+def _instrument(engine) -> None:
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    pool = sync_engine.pool
+    # Pool.connect() is where a request waits for a free (or new) connection
+    if not hasattr(pool.connect, "__wrapped__"):
+        pool.connect = _timed_connect(pool.connect)
+
+    for target, name, listener in (
+        (pool, "checkout", _on_checkout),
+        (pool, "checkin", _on_checkin),
+        (sync_engine, "before_cursor_execute", _on_execute),
+    ):
+        if not event.contains(target, name, listener):
+            event.listen(target, name, listener)
+
+
+class SessionMiddleware(BaseMiddleware):
+    """
+    Opens at most one session per update and injects it as `data["session"]`.
+
+    The session is created on first use, so updates that never touch the
+    database cost nothing.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], "AsyncSession"],  # type: ignore  # noqa: F821
+        *,
+        default_behavior: Literal["read", "write"] = "read",
+        metrics: Callable[[SessionMetrics], Any] | None = None,
+        engine: "AsyncEngine | None" = None,  # type: ignore  # noqa: F821
+        key: str = "session",
+    ):
+        """
+        Args:
+            session_factory: Callable returning a new AsyncSession.
+            default_behavior: Used when the handler has no `session` flag.
+            metrics: Called with the `SessionMetrics` of every update that
+                used the session; may be a coroutine function.
+            engine: Engine to instrument; taken from an `async_sessionmaker`
+                bind when omitted. Without one only commit/failure is reported.
+                Instrument again after `engine.dispose()`, which replaces the pool.
+            key: Name of the injected handler argument.
+        """
+        self.session_factory = session_factory
+        self.default_behavior = default_behavior
+        self.metrics = metrics
+        self.key = key
+
+        engine = engine or getattr(session_factory, "kw", {}).get("bind")
+        if metrics is not None and engine is not None:
+            _instrument(engine)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        # an outer middleware already provides the session
+        if self.key in data or _joinable(self.session_factory) is not None:
+            return await handler(event, data)
+
+        behavior = get_flag(data, "session", default=self.default_behavior)
+        metrics = SessionMetrics(behavior=behavior)
+        metrics_token = _metrics.set(metrics)
+
+        proxy = LazySession(self.session_factory)
+        scope = AmbientSession(self.session_factory, proxy, behavior)
+        token = _ambient.set(scope)
+        data[self.key] = proxy
+        try:
+            result = await handler(event, data)
+            if proxy.created and behavior == "write":
+                await proxy.session.commit()
+                metrics.committed = True
+                await _invalidate_committed(scope)
+            return result
+        except Exception:
+            metrics.failed = True
+            if proxy.created:
+                await proxy.session.rollback()
+            raise
+        finally:
+            _ambient.reset(token)
+            if proxy.created:
+                await proxy.session.close()
+            _metrics.reset(metrics_token)
+            if proxy.created and self.metrics is not None:
+                await self._report(metrics)
+
+    async def _report(self, metrics: SessionMetrics) -> None:
+        try:
+            result = self.metrics(metrics)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.exception("Session metrics callback failed")
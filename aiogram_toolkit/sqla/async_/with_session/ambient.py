@@ -0,0 +1,88 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class AmbientSession:
+    """The session shared by the decorated calls of the current update."""
+
+    factory: Callable[[], Any]
+    session: Any
+    behavior: str  # "read" or "write" of the outermost scope
+    # (cache, tags) of nested writes, dropped once this scope commits
+    invalidations: List[Tuple[Any, Tuple[str, ...]]] = field(default_factory=list)
+
+
+_ambient: ContextVar[AmbientSession | None] = ContextVar("aiogram_toolkit_session", default=None)
+
+
+def current_session(session_factory: Callable[[], Any] | None = None):
+    """
+    Session of the enclosing `with_session` / `function_with_session` scope.
+
+    Args:
+        session_factory: Only return a session created by this factory.
+
+    Returns:
+        The session, or None outside any scope.
+    """
+    ambient = _ambient.get()
+    if ambient is None or (session_factory is not None and ambient.factory is not session_factory):
+        return None
+    return ambient.session
+
+
+def _joinable(session_factory: Callable[[], Any]) -> AmbientSession | None:
+    ambient = _ambient.get()
+    if ambient is not None and ambient.factory is session_factory:
+        return ambient
+    return None
+
+
+async def _invalidate_committed(ambient: AmbientSession) -> None:
+    invalidations = ambient.invalidations[:]
+    ambient.invalidations.clear()
+    for cache, tags in invalidations:
+        await cache.invalidate(*tags)
+
+
+# ---- SAVEPOINTs on SQLite -----------------------------------------------------
+def _sqlite_connect(dbapi_connection, connection_record) -> None:
+    # stop pysqlite from managing transactions itself
+    dbapi_connection.isolation_level = None
+
+
+def _sqlite_begin(conn) -> None:
+    conn.exec_driver_sql("BEGIN")
+
+
+def sqlite_savepoints(engine) -> None:
+    """
+    Make SAVEPOINTs work on a pysqlite / aiosqlite engine.
+
+    pysqlite does not emit BEGIN before a SAVEPOINT, so releasing it
+    commits right away. This installs SQLAlchemy's documented workaround
+    (explicit BEGIN, no pysqlite transaction handling); nested "write"
+    scopes only use SAVEPOINTs on SQLite engines prepared this way. Call
+    it before the engine opens its first connection.
+
+    Reads then run in a transaction as well; use WAL mode
+    (`PRAGMA journal_mode=WAL`) so an open reader does not block a write
+    committing in another session.
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "begin", _sqlite_begin):
+        event.listen(sync_engine, "connect", _sqlite_connect)
+        event.listen(sync_engine, "begin", _sqlite_begin)
+
+
+def _savepoints_work(session) -> bool:
+    from sqlalchemy import event
+
+    engine = session.get_bind()
+    if engine is None or engine.dialect.name != "sqlite":
+        return True
+    return event.contains(getattr(engine, "engine", engine), "begin", _sqlite_begin)
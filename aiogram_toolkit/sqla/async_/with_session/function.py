@@ -1,36 +1,142 @@
 from functools import wraps
-from typing import Callable
+from typing import Any, Callable, Hashable, Iterable
 
+from ....logger import logger
+from .ambient import AmbientSession, _ambient, _invalidate_committed, _joinable, _savepoints_work
 
-def function_with_session(session_factory: Callable[[], "AsyncSession"], behavior="read"): # type: ignore  # noqa: F821
+
+def _resolve_tags(tags, args, kwargs) -> tuple:
+    return tuple(tags(*args, **kwargs) if callable(tags) else tags)
+
+
+_warned = False
+
+
+def _warn_no_savepoints() -> None:
+    global _warned
+    if not _warned:
+        _warned = True
+        logger.warning(
+            "Nested write scopes on SQLite run without SAVEPOINTs; "
+            "call sqlite_savepoints(engine) at startup to isolate them"
+        )
+
+
+def function_with_session(
+    session_factory: Callable[[], "AsyncSession"], # type: ignore  # noqa: F821
+    behavior="read",
+    cache: "QueryCache | None" = None,  # type: ignore  # noqa: F821
+    tags: Iterable[str] | Callable[..., Iterable[str]] = (),
+    ttl: float | None = None,
+    convert: Callable[[Any], Any] | None = None,
+    invalidates: Iterable[str] | Callable[..., Iterable[str]] = (),
+    key: Callable[..., Hashable] | None = None,
+):
     """
     Decorator to manage SQLAlchemy sessions, with lazy imports.
 
+    Calls nested inside another `function_with_session` / `with_session`
+    scope of the same factory join its session instead of opening a new
+    one, and only the outermost scope closes it. A nested "write" joins only
+    a "write" scope: it runs in a SAVEPOINT, so a failure undoes only its
+    own changes, and is committed by the outermost scope. Under a "read"
+    scope (including `with_session`'s default) it opens and commits its own
+    session, leaving the reader's objects and pending changes alone.
+
+    On SQLite, SAVEPOINTs are only used after `sqlite_savepoints(engine)`;
+    otherwise a nested write runs directly in the outer transaction and a
+    failure does not undo its changes.
+
     Parameters:
     - behavior: "read" (no commit) or "write" (commit & rollback on failure).
+    - cache: `QueryCache`; "read" results are cached by function and arguments
+      (hits open no session), "write" calls invalidate `invalidates` tags.
+    - tags: Tags of cached "read" results; an iterable or a callable taking
+      the function's arguments.
+    - ttl: Per-function TTL overriding the cache default.
+    - convert: Turns the result into what is cached, e.g. ORM objects into dicts.
+    - invalidates: Tags dropped after a successful "write"; iterable or callable.
+      Inside an enclosing "write" scope they are dropped once that scope
+      commits, so reads in between cannot cache the old rows again.
+    - key: Callable taking the function's arguments and returning the value
+      that identifies a cached result; needed when the arguments are not
+      hashable values with a meaningful repr (ORM objects, events...).
     """
 
     def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
+        async def call(args, kwargs):
             # Lazy import to avoid loading SQLAlchemy until needed
             from sqlalchemy.ext.asyncio import AsyncSession
             from sqlalchemy.exc import SQLAlchemyError
 
+            outer = _joinable(session_factory)
+            if outer is not None and behavior != "write":
+                kwargs["session"] = outer.session
+                return await func(*args, **kwargs)
+
+            if outer is not None and outer.behavior == "write":
+                session = kwargs["session"] = outer.session
+                # invalidations wait for the outermost commit
+                scope = AmbientSession(session_factory, session, "write", outer.invalidations)
+                token = _ambient.set(scope)
+                try:
+                    if _savepoints_work(session):
+                        # the savepoint undoes only this call's changes on failure
+                        async with session.begin_nested():
+                            result = await func(*args, **kwargs)
+                    else:
+                        _warn_no_savepoints()
+                        result = await func(*args, **kwargs)
+                finally:
+                    _ambient.reset(token)
+                return result
+
             async with session_factory() as session:
+                scope = AmbientSession(session_factory, session, behavior)
+                token = _ambient.set(scope)
                 try:
                     kwargs["session"] = session
                     result = await func(*args, **kwargs)
                     if behavior == "write":
                         await session.commit()
+                        await _invalidate_committed(scope)
                     return result
                 except SQLAlchemyError:
                     if behavior == "write":
                         await session.rollback()
                     raise
                 finally:
+                    _ambient.reset(token)
                     await session.close()
 
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if cache is None:
+                return await call(args, kwargs)
+
+            if behavior == "write":
+                outer = _joinable(session_factory)
+                result = await call(args, kwargs)
+                invalidated = _resolve_tags(invalidates, args, kwargs)
+                if outer is not None and outer.behavior == "write":
+                    # not committed yet: a read now would cache the old rows
+                    outer.invalidations.append((cache, invalidated))
+                else:
+                    await cache.invalidate(*invalidated)
+                return result
+
+            kwargs.pop("session", None)
+            if key is None:
+                cache_key = cache.key(func, args, kwargs)
+            else:
+                cache_key = cache.key(func, (key(*args, **kwargs),), {})
+
+            async def load():
+                result = await call(args, dict(kwargs))
+                return convert(result) if convert is not None else result
+
+            return await cache.get_or_load(cache_key, load, _resolve_tags(tags, args, kwargs), ttl)
+
         return wrapper
 
     return decorator
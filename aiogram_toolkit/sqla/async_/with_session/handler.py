@@ -1,10 +1,26 @@
 from functools import wraps
 from typing import Callable, Literal
 
+from .ambient import AmbientSession, _ambient, _joinable
+from .lazy import LazySession, lazy_session_stats
+
+
+async def _finalize(session, finally_do: Literal["close", "expunge"]) -> None:
+    if finally_do == "expunge":
+        session.expunge_all()
+    else:
+        # AsyncSession.close() is a coroutine
+        close_method = getattr(session, "close", None)
+        if close_method and callable(close_method):
+            maybe_coro = close_method()
+            if maybe_coro is not None:
+                await maybe_coro
+
 
 def with_session(
     session_factory: Callable[[], "AsyncSession"], # type: ignore  # noqa: F821
-    finally_do: Literal["close", "expunge"] = "expunge"
+    finally_do: Literal["close", "expunge"] = "expunge",
+    lazy: bool = False,
 ):
     """
     Decorator to manage SQLAlchemy session lifecycle in an Aiogram handler.
@@ -12,14 +28,60 @@ def with_session(
     Args:
         session_factory (callable): A callable returning a new SQLAlchemy AsyncSession.
         finally_do (str): 'close' or 'expunge' — defines final session handling.
+        lazy (bool): Pass a `LazySession` proxy that opens the session on first
+            use; if the handler never touches it, setup and teardown are skipped.
+            See `lazy_session_stats` for how many sessions were avoided.
+
+    The session becomes the ambient session of the update: "read" functions
+    decorated with `function_with_session` (same factory) called by the
+    handler join it instead of opening their own; "write" ones still open
+    and commit their own session. If an outer scope already provides one, the
+    handler joins it and leaves its lifecycle to that scope.
     """
     def decorator(handler):
+        if lazy:
+            @wraps(handler)
+            async def lazy_handler(event, *args, **kwargs):
+                if "session" in kwargs:
+                    return await handler(event, *args, **kwargs)
+                outer = _joinable(session_factory)
+                if outer is not None:
+                    return await handler(event, session=outer.session, *args, **kwargs)
+
+                proxy = LazySession(session_factory)
+                token = _ambient.set(AmbientSession(session_factory, proxy, "read"))
+                try:
+                    return await handler(event, session=proxy, *args, **kwargs)
+                except Exception:
+                    if proxy.created:
+                        await proxy.session.rollback()
+                    raise
+                finally:
+                    _ambient.reset(token)
+                    if proxy.created:
+                        session = proxy.session
+                        try:
+                            await _finalize(session, finally_do)
+                        finally:
+                            await session.close()
+                    else:
+                        lazy_session_stats.avoided += 1
+
+            return lazy_handler
+
         @wraps(handler)
         async def wrapped_handler(event, *args, **kwargs):
             # Lazy import to avoid loading SQLAlchemy globally
             from sqlalchemy.ext.asyncio import AsyncSession
 
+            outer = _joinable(session_factory)
+            if outer is not None:
+                if "session" in kwargs:
+                    return await handler(event, *args, **kwargs)
+                return await handler(event, session=outer.session, *args, **kwargs)
+
             async with session_factory() as session:
+                token = _ambient.set(AmbientSession(session_factory, session, "read"))
                 try:
                     if "session" in kwargs:
                         return await handler(event, *args, **kwargs)
@@ -28,15 +90,8 @@ def with_session(
                     await session.rollback()
                     raise
                 finally:
-                    if finally_do == "expunge":
-                        session.expunge_all()
-                    else:
-                        # AsyncSession.close() is a coroutine
-                        close_method = getattr(session, "close", None)
-                        if close_method and callable(close_method):
-                            maybe_coro = close_method()
-                            if maybe_coro is not None:
-                                await maybe_coro
+                    _ambient.reset(token)
+                    await _finalize(session, finally_do)
 
         return wrapped_handler
     return decorator
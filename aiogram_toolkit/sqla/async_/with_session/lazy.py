@@ -0,0 +1,52 @@
+from typing import Any, Callable
+
+
+class LazySessionStats:
+    """Counters for `with_session(lazy=True)`."""
+
+    def __init__(self) -> None:
+        self.created = 0  # handler calls that actually used the session
+        self.avoided = 0  # handler calls that never touched it
+
+    def reset(self) -> None:
+        self.created = self.avoided = 0
+
+
+lazy_session_stats = LazySessionStats()
+
+
+class LazySession:
+    """
+    Stand-in for an `AsyncSession` that opens the real one on first use.
+
+    Every attribute access (`execute`, `add`, `scalar`, ...) is forwarded to
+    the real session, creating it first if needed. A handler that never
+    touches the proxy costs no session and no connection.
+
+    Note: `isinstance(proxy, AsyncSession)` is False; use `.session` where
+    the real object is required.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, session_factory: Callable[[], "AsyncSession"]) -> None:  # type: ignore  # noqa: F821
+        self._factory = session_factory
+        self._session = None
+
+    @property
+    def created(self) -> bool:
+        return self._session is not None
+
+    @property
+    def session(self) -> "AsyncSession":  # type: ignore  # noqa: F821
+        if self._session is None:
+            self._session = self._factory()
+            lazy_session_stats.created += 1
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    def __repr__(self) -> str:
+        state = "created" if self._session is not None else "not created"
+        return f"<LazySession ({state})>"
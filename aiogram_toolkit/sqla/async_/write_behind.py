@@ -0,0 +1,292 @@
+"""
+Write-behind buffer for small, frequent writes.
+
+Bumping a counter or a `last_seen` column in its own "write" transaction
+costs a commit per update. `WriteBehind` collects such writes in memory,
+coalesces them per entity (increments are summed, upserts keep the latest
+values) and flushes them as bulk statements in one transaction when
+`max_batch` entities are pending or `flush_interval` seconds have passed.
+
+Within a flush, upserts are written before increments. An upsert replaces
+the pending deltas of the columns it sets, so mixing both on one entity
+ends with the values the writes would have produced one by one, except
+that an increment of a row which only a later upsert inserts is applied
+to the inserted row instead of being lost.
+
+A buffered write is lost only if the process dies before the next flush,
+so at most `flush_interval` seconds of writes are at risk. `close()` flushes
+what is left on shutdown.
+
+Example:
+    buffer = WriteBehind(Session, flush_interval=2.0)
+    buffer.start()
+
+    buffer.increment(User, {"id": user_id}, messages=1)
+    buffer.upsert(User, {"id": user_id}, last_seen=datetime.now())
+
+    await buffer.close()  # on shutdown
+"""
+
+import asyncio
+import contextvars
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from ...logger import logger
+from .with_session.function import function_with_session
+
+# (model or table, key columns and values)
+_EntityKey = Tuple[Any, Tuple[Tuple[str, Any], ...]]
+
+
+class WriteBehind:
+    """Coalescing write-behind buffer for upserts and increments."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], "AsyncSession"],  # type: ignore  # noqa: F821
+        *,
+        max_batch: int = 1000,
+        flush_interval: float = 1.0,
+        max_pending: int = 100_000,
+    ) -> None:
+        """
+        Args:
+            session_factory: Callable returning a new AsyncSession.
+            max_batch: Flush early once this many entities are pending.
+            flush_interval: Maximum seconds a write waits in the buffer.
+            max_pending: Hard cap on pending entities (e.g. while the
+                database is down); writes for new entities beyond it are
+                dropped and counted in `dropped`.
+        """
+        if max_batch <= 0 or flush_interval <= 0:
+            raise ValueError("max_batch and flush_interval must be positive")
+        bind = getattr(session_factory, "kw", {}).get("bind")
+        if bind is not None and bind.dialect.name not in _UPSERT_DIALECTS:
+            raise ValueError(f"Write-behind upserts are not supported on {bind.dialect.name!r}")
+
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._upserts: Dict[_EntityKey, Dict[str, Any]] = {}
+        self._increments: Dict[_EntityKey, Dict[str, Any]] = {}
+        self._full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+        self.flushes = 0
+        self.written = 0  # entities written
+        self.coalesced = 0  # writes merged into an already pending entity
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._upserts) + len(self._increments)
+
+    # ---- enqueueing (never awaits) ------------------------------------------
+    def _accept(self, buffer: Dict[_EntityKey, Dict[str, Any]], entity: _EntityKey) -> Dict[str, Any] | None:
+        values = buffer.get(entity)
+        if values is not None:
+            self.coalesced += 1
+            return values
+        if self.pending >= self.max_pending:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("Write-behind buffer full, %s writes dropped", self.dropped)
+            return None
+        values = buffer[entity] = {}
+        if self.pending >= self.max_batch:
+            self._full.set()
+        return values
+
+    def upsert(self, model: Any, key: Mapping[str, Any], **values: Any) -> None:
+        """
+        Insert the row identified by `key`, or update `values` if it exists.
+
+        `key` maps column names to values and must match a unique constraint.
+        Later upserts of the same entity overwrite earlier values column by
+        column, and pending increments of the columns set here are dropped.
+        """
+        entity = (model, tuple(sorted(key.items())))
+        pending = self._accept(self._upserts, entity)
+        if pending is not None:
+            pending.update(values)
+            # the upsert overwrites whatever the deltas would have added
+            deltas = self._increments.get(entity)
+            if deltas:
+                for column in values:
+                    deltas.pop(column, None)
+                if not deltas:
+                    del self._increments[entity]
+
+    def increment(self, model: Any, key: Mapping[str, Any], **deltas: Any) -> None:
+        """
+        Add `deltas` to the columns of the existing row identified by `key`.
+
+        Increments of the same entity are summed before flushing.
+        """
+        pending = self._accept(self._increments, (model, tuple(sorted(key.items()))))
+        if pending is not None:
+            for column, delta in deltas.items():
+                pending[column] = pending.get(column, 0) + delta
+
+    # ---- flushing -----------------------------------------------------------
+    async def flush(self) -> int:
+        """
+        Write everything pending in one transaction.
+
+        Runs outside any ambient session of the caller. On failure the
+        writes are put back (merged with newer ones) and the error re-raised.
+        Cancelling the caller does not cancel a flush under way: its commit
+        may already have succeeded, so the writes are only put back if the
+        flush then fails.
+
+        Returns:
+            Number of entities written.
+        """
+        # a fresh context keeps the flush out of the caller's session scope
+        task = asyncio.get_running_loop().create_task(self._flush(), context=contextvars.Context())
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            task.add_done_callback(self._log_failure)
+            raise
+
+    def _log_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "Write-behind flush failed, %s entities kept", self.pending, exc_info=task.exception()
+            )
+
+    async def _flush(self) -> int:
+        async with self._flush_lock:
+            upserts, self._upserts = self._upserts, {}
+            increments, self._increments = self._increments, {}
+            self._full.clear()
+            if not upserts and not increments:
+                return 0
+
+            write = function_with_session(self.session_factory, behavior="write")(self._write)
+            try:
+                await write(upserts, increments)
+            except BaseException:
+                self._restore(upserts, increments)
+                raise
+
+            self.flushes += 1
+            self.written += len(upserts) + len(increments)
+            return len(upserts) + len(increments)
+
+    def _restore(self, upserts, increments) -> None:
+        # older values first, newer writes win / add up; newer upserts also
+        # replace the older deltas of their columns
+        for entity, deltas in increments.items():
+            newer_values = self._upserts.get(entity, {})
+            deltas = {column: delta for column, delta in deltas.items() if column not in newer_values}
+            if deltas:
+                newer = self._increments.setdefault(entity, {})
+                for column, delta in deltas.items():
+                    newer[column] = newer.get(column, 0) + delta
+        for entity, values in upserts.items():
+            self._upserts[entity] = {**values, **self._upserts.get(entity, {})}
+
+    async def _write(self, upserts, increments, session) -> None:
+        from sqlalchemy import bindparam, inspect as sa_inspect, update
+
+        dialect = session.bind.dialect.name
+
+        # group by statement shape so each group is one executemany
+        groups: Dict[Tuple[Any, Tuple[str, ...], Tuple[str, ...]], List[Dict[str, Any]]] = defaultdict(list)
+        for (model, key), values in upserts.items():
+            key_columns = tuple(column for column, _ in key)
+            groups[(model, key_columns, tuple(sorted(values)))].append({**dict(key), **values})
+
+        for (model, key_columns, columns), rows in groups.items():
+            table = _table(model, sa_inspect)
+            await session.execute(_upsert_statement(dialect, table, key_columns, columns), rows)
+
+        groups.clear()
+        for (model, key), deltas in increments.items():
+            key_columns = tuple(column for column, _ in key)
+            params = {f"k_{column}": value for column, value in key}
+            params.update({f"d_{column}": delta for column, delta in deltas.items()})
+            groups[(model, key_columns, tuple(sorted(deltas)))].append(params)
+
+        for (model, key_columns, columns), rows in groups.items():
+            table = _table(model, sa_inspect)
+            stmt = (
+                update(table)
+                .where(*(table.c[column] == bindparam(f"k_{column}") for column in key_columns))
+                .values({column: table.c[column] + bindparam(f"d_{column}") for column in columns})
+            )
+            await session.execute(stmt, rows)
+
+    # ---- background loop ------------------------------------------------------
+    def start(self) -> None:
+        """Start the background flush loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(), context=contextvars.Context()
+            )
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Write-behind flush failed, %s entities kept", self.pending)
+
+    async def close(self) -> None:
+        """Stop the loop and flush what is pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def __aenter__(self) -> "WriteBehind":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+
+_UPSERT_DIALECTS = ("postgresql", "sqlite", "mysql", "mariadb")
+
+
+def _table(model: Any, sa_inspect) -> Any:
+    return model if hasattr(model, "c") else sa_inspect(model).local_table
+
+
+def _upsert_statement(dialect: str, table: Any, key_columns: Tuple[str, ...], columns: Tuple[str, ...]):
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table)
+        if not columns:
+            return stmt.on_conflict_do_nothing(index_elements=list(key_columns))
+        return stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={column: stmt.excluded[column] for column in columns},
+        )
+
+    if dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+
+        stmt = insert(table)
+        update_columns = columns or key_columns[:1]
+        return stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in update_columns})
+
+    raise ValueError(f"Write-behind upserts are not supported on {dialect!r}")
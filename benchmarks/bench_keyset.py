@@ -0,0 +1,73 @@
+"""
+Per-page latency of `KeysetPaginator` against OFFSET + COUNT(*) at growing
+depths of a large SQLite table (1M rows by default; built once in a temp dir).
+
+Run from the repository root (needs SQLAlchemy and aiosqlite):
+
+    python benchmarks/bench_keyset.py [rows]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import String, func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from aiogram_toolkit.pagination.keyset import KeysetPaginator
+
+PER_PAGE = 20
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+
+
+async def timed(fetch, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fetch()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+async def main(rows: int) -> None:
+    path = Path(tempfile.gettempdir()) / f"aiogram_toolkit_bench_keyset_{rows}.sqlite"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    if not path.exists() or path.stat().st_size == 0:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for start in range(0, rows, 100_000):
+                batch = range(start, min(start + 100_000, rows))
+                await conn.execute(insert(Item), [{"id": i, "name": f"item {i}"} for i in batch])
+
+    query = select(Item)
+    paginator = KeysetPaginator(query, Item.id, PER_PAGE)
+    async with async_sessionmaker(engine)() as session:
+        await paginator.fetch(session)  # warm the cached counts, like a live list
+
+        async def offset_page(depth):
+            await session.execute(query.order_by(Item.id).offset(depth * PER_PAGE).limit(PER_PAGE))
+            await session.scalar(select(func.count()).select_from(Item))
+
+        for depth in (0, rows // PER_PAGE // 10, rows // PER_PAGE // 2, rows // PER_PAGE - 1):
+            after = (depth * PER_PAGE - 1,) if depth else None
+            keyset = await timed(lambda: paginator.fetch(session, depth + 1, after=after), 20)
+            offset = await timed(lambda: offset_page(depth), 5)
+            print(f"page {depth + 1:>7}: keyset {keyset:7.2f} ms   OFFSET + COUNT(*) {offset:8.2f} ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
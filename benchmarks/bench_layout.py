@@ -0,0 +1,71 @@
+"""
+`get_paginated_page` with a precompiled `PageLayout` against the
+`InlineKeyboardBuilder` path, for 50-button pages.
+
+Run from the repository root:
+
+    python benchmarks/bench_layout.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiogram.types import InlineKeyboardButton
+
+from aiogram_toolkit.pagination.layout import PageLayout
+from aiogram_toolkit.pagination.paginated_page import get_paginated_page
+
+N = 2000
+BUTTONS_PER_ROW = 6
+
+TOP = [[
+    InlineKeyboardButton(text="Search", callback_data="search"),
+    InlineKeyboardButton(text="Filter", callback_data="filter"),
+]]
+BOTTOM = [[InlineKeyboardButton(text="Back", callback_data="back")]]
+CONTROLS = [
+    InlineKeyboardButton(text="<", callback_data="prev"),
+    InlineKeyboardButton(text=">", callback_data="next"),
+]
+PAGE_DATA = [
+    {"string": f"item {i}", "button": InlineKeyboardButton(text=str(i), callback_data=f"item:{i}")}
+    for i in range(50)
+]
+LAYOUT = PageLayout(BUTTONS_PER_ROW, TOP, BOTTOM, CONTROLS)
+
+
+async def render(**kwargs):
+    return await get_paginated_page(PAGE_DATA, 2, 500, 150, 3, BUTTONS_PER_ROW, **kwargs)
+
+
+async def per_page(**kwargs) -> float:
+    started = time.perf_counter()
+    for _ in range(N):
+        await render(**kwargs)
+    return (time.perf_counter() - started) / N * 1e6
+
+
+async def main() -> None:
+    builder_kwargs = dict(control_btns=CONTROLS, extra_btns_top=TOP, extra_btns_bottom=BOTTOM)
+    (text, markup), (layout_text, layout_markup) = await render(**builder_kwargs), await render(layout=LAYOUT)
+    assert text == layout_text and markup.model_dump() == layout_markup.model_dump()
+
+    builder = await per_page(**builder_kwargs)
+    layout = await per_page(layout=LAYOUT)
+    buttons = [item["button"] for item in PAGE_DATA]
+    started = time.perf_counter()
+    for _ in range(N):
+        LAYOUT.render(buttons, True, True)
+    render_only = (time.perf_counter() - started) / N * 1e6
+
+    print(f"InlineKeyboardBuilder  {builder:8.1f} us/page")
+    print(f"PageLayout             {layout:8.1f} us/page  x{builder / layout:.1f}")
+    print(f"PageLayout.render only {render_only:8.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+"""
+Speed and peak memory of `iter_long_msg` (streaming) against `safe_long_msg`
+on a ~10 MB report, measured with tracemalloc.
+
+Run from the repository root:
+
+    python benchmarks/bench_long_msg.py
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiogram_toolkit.long_msg import BR, iter_long_msg, safe_long_msg
+
+LINES = 90_000
+LINES_PER_FRAGMENT = 100
+
+
+def report_lines():
+    rng = random.Random(1)
+    for i in range(LINES):
+        yield f"line {i} " + "x" * rng.randint(10, 200) + BR
+
+
+def fragments():
+    # as a report generator would produce it: ~12 KB at a time
+    batch = []
+    for line in report_lines():
+        batch.append(line)
+        if len(batch) == LINES_PER_FRAGMENT:
+            yield "".join(batch)
+            batch.clear()
+    if batch:
+        yield "".join(batch)
+
+
+def measure(func, arg):
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    result = func(arg)
+    elapsed = time.perf_counter() - started
+    return result, elapsed, tracemalloc.get_traced_memory()[1] - base
+
+
+def main() -> None:
+    tracemalloc.start()
+    parts = list(fragments())
+    text = "".join(parts)
+
+    # peaks exclude the input, which both variants receive ready-made
+    streamed, stream_time, stream_peak = measure(lambda p: sum(1 for _ in iter_long_msg(p)), parts)
+    chunks, list_time, list_peak = measure(safe_long_msg, text)
+    tracemalloc.stop()
+
+    assert streamed == len(chunks)
+    print(f"input: {len(text) / 1e6:.1f} MB in {len(parts)} fragments, {len(chunks)} chunks")
+    print(f"iter_long_msg   {stream_time:6.2f} s  peak {stream_peak / 1e6:7.2f} MB")
+    print(f"safe_long_msg   {list_time:6.2f} s  peak {list_peak / 1e6:7.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Update dispatch through a router of 50 callback filters, with and without
+the per-update unpack memo (`CallbackMemoMiddleware`).
+
+25 filters are aiogram's `Item.filter(...)`, 25 are `safe_cd_unpack`
+filters; only the last one matches, so every filter sees the payload.
+
+Run from the repository root:
+
+    python benchmarks/bench_memo.py
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.types import CallbackQuery, Update, User
+
+from aiogram_toolkit.callback_data.memo import CallbackMemoMiddleware
+from aiogram_toolkit.callback_data.safe_unpack.decorator import safe_cd_unpack
+from aiogram_toolkit.deeplink_callback import BaseCB
+
+N = 2000
+
+
+class Item(BaseCB, prefix="item"):
+    action: str
+    item_id: int
+    page: int = 1
+
+
+def build(memo: bool) -> Dispatcher:
+    dp, router = Dispatcher(), Router()
+    for i in range(25):
+        router.callback_query.register(lambda c: None, Item.filter(F.action == f"a{i}"))
+    for i in range(25, 50):
+        @safe_cd_unpack(Item)
+        def matches(cd, i=i):
+            return cd.action == f"a{i}"
+
+        router.callback_query.register(lambda c: None, matches)
+    dp.include_router(router)
+    if memo:
+        dp.update.outer_middleware(CallbackMemoMiddleware())
+    return dp
+
+
+async def main() -> None:
+    logging.disable(logging.INFO)  # aiogram logs every handled update
+    bot = Bot("42:TEST")
+    user = User(id=1, is_bot=False, first_name="u")
+    update = Update(
+        update_id=1,
+        callback_query=CallbackQuery(
+            id="1", from_user=user, chat_instance="c", data=Item(action="a49", item_id=7).pack()
+        ),
+    )
+    try:
+        for memo in (False, True):
+            dp = build(memo)
+            for _ in range(100):
+                await dp.feed_update(bot, update)
+            started = time.perf_counter()
+            for _ in range(N):
+                await dp.feed_update(bot, update)
+            elapsed = (time.perf_counter() - started) / N * 1e6
+
+            calls = 0
+            unpack = Item._unpack.__func__
+
+            def counting(cls, value):
+                nonlocal calls
+                calls += 1
+                return unpack(cls, value)
+
+            Item._unpack = classmethod(counting)
+            await dp.feed_update(bot, update)
+            Item._unpack = classmethod(unpack)
+            print(f"memo={str(memo):5}  {elapsed:6.0f} us/update  {calls} parses/update")
+    finally:
+        await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+"""`Broadcast` resumes a checkpointed job only when given its `job_id`."""
+
+import asyncio
+
+from aiogram_toolkit.broadcast import Broadcast
+from aiogram_toolkit.rate_limit import ChatRateLimiter
+
+
+class FakeBot:
+    def __init__(self) -> None:
+        self.sent = []
+
+    async def send_message(self, chat_id, **params):
+        self.sent.append(chat_id)
+
+
+def _send(bot, path, **kwargs):
+    broadcast = Broadcast(
+        bot, "hello", parse_mode=None, checkpoint=str(path),
+        limiter=ChatRateLimiter(10_000, 10_000, 10_000), **kwargs,
+    )
+    return asyncio.run(broadcast.run(range(50)))
+
+
+def test_same_content_is_a_new_job(tmp_path):
+    bot = FakeBot()
+    _send(bot, tmp_path / "b.sqlite")
+    stats = _send(bot, tmp_path / "b.sqlite")
+    assert stats.sent == 50 and stats.resumed == 0
+    assert len(bot.sent) == 100
+
+
+def test_job_id_resumes(tmp_path):
+    bot = FakeBot()
+    _send(bot, tmp_path / "b.sqlite", job_id="news")
+    stats = _send(bot, tmp_path / "b.sqlite", job_id="news")
+    assert stats.sent == 0 and stats.resumed == 50
+    assert sorted(bot.sent) == list(range(50))
@@ -0,0 +1,73 @@
+"""Callback data is parsed once per update, however many filters look at it."""
+
+import asyncio
+
+import pytest
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.types import CallbackQuery, Update, User
+
+from aiogram_toolkit.callback_data.memo import CallbackMemoMiddleware, memo_unpack, unpack_scope
+from aiogram_toolkit.callback_data.safe_unpack.decorator import safe_cd_unpack
+from aiogram_toolkit.deeplink_callback import BaseCB
+
+
+class Item(BaseCB, prefix="memo_item"):
+    action: str
+    item_id: int
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    calls = []
+    unpack = Item._unpack.__func__
+
+    def counting(cls, value):
+        calls.append(value)
+        return unpack(cls, value)
+
+    monkeypatch.setattr(Item, "_unpack", classmethod(counting))
+    return calls
+
+
+def _update(update_id: int, data: str) -> Update:
+    user = User(id=1, is_bot=False, first_name="u")
+    return Update(
+        update_id=update_id,
+        callback_query=CallbackQuery(id=str(update_id), from_user=user, chat_instance="c", data=data),
+    )
+
+
+def test_one_unpack_per_update(parses):
+    dp, router, handled = Dispatcher(), Router(), []
+    for i in range(5):
+        router.callback_query.register(lambda c, i=i: handled.append(i), Item.filter(F.action == f"a{i}"))
+    for i in range(5, 10):
+        @safe_cd_unpack(Item)
+        def matches(cd, i=i):
+            return cd.action == f"a{i}"
+
+        router.callback_query.register(lambda c, i=i: handled.append(i), matches)
+    dp.include_router(router)
+    dp.update.outer_middleware(CallbackMemoMiddleware())
+
+    async def main():
+        bot = Bot("42:TEST")
+        try:
+            data = Item(action="a9", item_id=7).pack()
+            await dp.feed_update(bot, _update(1, data))
+            await dp.feed_update(bot, _update(2, data))
+        finally:
+            await bot.session.close()
+
+    asyncio.run(main())
+    assert handled == [9, 9]
+    # once per update: the memo does not outlive its update
+    assert len(parses) == 2
+
+
+def test_failures_are_memoized(parses):
+    with unpack_scope():
+        for _ in range(3):
+            with pytest.raises(Exception):
+                memo_unpack(Item, "memo_item:a:not-a-number", Item._unpack)
+    assert len(parses) == 1
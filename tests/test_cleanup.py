@@ -0,0 +1,40 @@
+"""`MessageCleaner.close()` deletes everything queued, including the batch in flight."""
+
+import asyncio
+from types import SimpleNamespace
+
+from aiogram_toolkit.deeplink_callback.cleanup import MessageCleaner
+
+
+class SlowBot:
+    def __init__(self) -> None:
+        self.deleted = []
+
+    async def delete_message(self, chat_id, message_id):
+        await asyncio.sleep(0.05)
+        self.deleted.append((chat_id, message_id))
+
+    async def delete_messages(self, chat_id, message_ids):
+        await asyncio.sleep(0.05)
+        self.deleted.extend((chat_id, message_id) for message_id in message_ids)
+
+
+def _message(bot, chat_id, message_id):
+    return SimpleNamespace(bot=bot, chat=SimpleNamespace(id=chat_id), message_id=message_id)
+
+
+def test_close_finishes_batch_in_flight():
+    async def main():
+        bot = SlowBot()
+        cleaner = MessageCleaner(per_chat_interval=10)
+        assert cleaner.schedule(_message(bot, 1, 1))
+        await asyncio.sleep(0.01)  # the worker is deleting message 1
+        cleaner.schedule(_message(bot, 1, 2))
+        cleaner.schedule(_message(bot, 2, 3))
+        await cleaner.close()
+        assert not cleaner.schedule(_message(bot, 1, 4))
+        return bot, cleaner
+
+    bot, cleaner = asyncio.run(main())
+    assert sorted(bot.deleted) == [(1, 1), (1, 2), (2, 3)]
+    assert cleaner.pending == 0
@@ -0,0 +1,69 @@
+"""`BaseCB`'s precompiled codec must agree with stock `CallbackData`."""
+
+from enum import Enum
+
+import pytest
+from aiogram.filters.callback_data import CallbackData
+from pydantic import model_validator
+
+from aiogram_toolkit.deeplink_callback.base import BaseCB
+
+
+class Color(str, Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+class Stock(CallbackData, prefix="c"):
+    color: Color
+    n: int
+    name: str = ""
+    flag: bool = False
+    page: int | None = None
+
+
+class Fast(BaseCB, prefix="c"):
+    color: Color
+    n: int
+    name: str = ""
+    flag: bool = False
+    page: int | None = None
+
+
+@pytest.mark.parametrize("payload", ["c:red:1::0:", "c:blue:-7:x:1:3", "c:red:+5:x:true:", "c:red:007:x:0:"])
+def test_same_as_stock(payload):
+    assert Fast.__codec__ is not None
+    stock = Stock.unpack(payload)
+    fast = Fast.unpack(payload)
+    assert fast.model_dump() == stock.model_dump()
+    assert fast.pack() == stock.pack()
+
+
+class PostInit(BaseCB, prefix="p"):
+    n: int
+
+    def model_post_init(self, context):
+        self.n *= 2
+
+
+class CustomInit(BaseCB, prefix="i"):
+    n: int
+
+    def __init__(self, **data):
+        data["n"] = int(data["n"]) + 1
+        super().__init__(**data)
+
+
+class Validated(BaseCB, prefix="v"):
+    n: int
+
+    @model_validator(mode="after")
+    def check(self):
+        self.n = abs(self.n)
+        return self
+
+
+@pytest.mark.parametrize(("cls", "payload", "n"), [(PostInit, "p:3", 6), (CustomInit, "i:3", 4), (Validated, "v:-3", 3)])
+def test_custom_construction_uses_stock_path(cls, payload, n):
+    assert cls.__codec__ is None
+    assert cls.unpack(payload).n == n
@@ -0,0 +1,93 @@
+"""`KeysetPaginator` page flags at the edges: last page, full last page, moving back."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from aiogram_toolkit.pagination.keyset import KeysetPaginator
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+
+def walk(tmp_path, rows, scenario):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            if rows:
+                await conn.execute(Item.__table__.insert(), [{"id": i} for i in range(1, rows + 1)])
+        try:
+            async with async_sessionmaker(engine)() as session:
+                return await scenario(session)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def ids(page):
+    return [item.id for item in page.items]
+
+
+def test_exactly_full_last_page(tmp_path):
+    async def scenario(session):
+        paginator = KeysetPaginator(select(Item), Item.id, per_page=10)
+        first = await paginator.fetch(session, 1)
+        last = await paginator.fetch(session, 2, after=first.last_key)
+        assert ids(first) == list(range(1, 11))
+        assert (first.has_prev, first.has_next, first.total_pages) == (False, True, 2)
+        assert ids(last) == list(range(11, 21))
+        assert (last.has_prev, last.has_next, last.total_pages) == (True, False, 2)
+
+    walk(tmp_path, 20, scenario)
+
+
+def test_single_full_page(tmp_path):
+    async def scenario(session):
+        page = await KeysetPaginator(select(Item), Item.id, per_page=10).fetch(session, 1)
+        assert (page.has_prev, page.has_next, page.total_pages) == (False, False, 1)
+
+    walk(tmp_path, 10, scenario)
+
+
+def test_empty(tmp_path):
+    async def scenario(session):
+        page = await KeysetPaginator(select(Item), Item.id, per_page=10).fetch(session, 1)
+        assert page.items == [] and page.first_key is None
+        assert (page.has_prev, page.has_next, page.total_pages) == (False, False, 1)
+
+    walk(tmp_path, 0, scenario)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_backward_navigation(tmp_path, descending):
+    async def scenario(session):
+        paginator = KeysetPaginator(select(Item), Item.id, per_page=10, descending=descending)
+        pages = [await paginator.fetch(session, 1)]
+        while pages[-1].has_next:
+            pages.append(await paginator.fetch(session, len(pages) + 1, after=pages[-1].last_key))
+        assert [len(page.items) for page in pages] == [10, 10, 5]
+
+        # back from the last page to the first
+        page = pages[-1]
+        for number in (2, 1):
+            page = await paginator.fetch(session, number, before=page.first_key)
+            assert ids(page) == ids(pages[number - 1])
+            assert page.has_next
+            assert page.has_prev == (number > 1)
+
+    walk(tmp_path, 25, scenario)
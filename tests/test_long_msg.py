@@ -0,0 +1,57 @@
+"""Streaming splitters yield exactly what `safe_long_msg` returns for the joined text."""
+
+import asyncio
+import random
+
+import pytest
+
+from aiogram_toolkit import long_msg
+from aiogram_toolkit.long_msg import aiter_long_msg, iter_long_msg, safe_long_msg, set_br
+
+
+def _fragments(rng: random.Random, text: str):
+    fragments, i = [], 0
+    while i < len(text):
+        size = rng.randint(0, 7)
+        fragments.append(text[i:i + size])
+        i += size
+    return fragments
+
+
+@pytest.fixture
+def br():
+    original = long_msg.BR
+    yield set_br
+    set_br(original)
+
+
+@pytest.mark.parametrize("marker", ["​" * 3, "aa", "&", "aba"])
+def test_streaming_matches_safe_long_msg(br, marker):
+    br(marker)
+    rng = random.Random(marker)
+    for i in range(1000):
+        text = "".join(rng.choice("ab​&x") for _ in range(rng.randint(0, 60)))
+        max_len = rng.randint(1, 12)
+        fragments = _fragments(rng, text)
+        expected = safe_long_msg(text, max_len)
+        assert list(iter_long_msg(fragments, max_len)) == expected, (text, max_len, fragments)
+
+        if i % 50 == 0:
+            async def collect():
+                return [chunk async for chunk in aiter_long_msg(fragments, max_len)]
+
+            assert asyncio.run(collect()) == expected
+
+
+def test_async_source():
+    async def source():
+        for i in range(500):
+            yield f"line {i} " + "x" * (i % 90) + long_msg.BR
+
+    async def collect():
+        return [chunk async for chunk in aiter_long_msg(source(), 1000)]
+
+    async def joined():
+        return "".join([fragment async for fragment in source()])
+
+    assert asyncio.run(collect()) == safe_long_msg(asyncio.run(joined()), 1000)
@@ -0,0 +1,55 @@
+"""The table-driven escapers must reproduce the per-character escaping they replaced."""
+
+import asyncio
+import random
+
+import pytest
+
+from aiogram_toolkit.md.escape import (
+    escape_html, escape_md, escape_md_v2, html_escaper, md_escaper, md_v2_escaper,
+)
+from aiogram_toolkit.md.format.md_v2 import escape_string
+
+HTML = {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}
+
+
+def per_char_backslash(chars: str, text: str) -> str:
+    return "".join(f"\\{char}" if char in chars else char for char in text)
+
+
+def per_char_html(text: str) -> str:
+    return "".join(HTML.get(char, char) for char in text)
+
+
+def texts():
+    rng = random.Random(8)
+    alphabet = "abc XYZ\\_*[]()~`>#+-=|{}.!&<>\"'😀\n"
+    yield ""
+    yield "plain text without specials"
+    for _ in range(2000):
+        yield "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 50)))
+
+
+@pytest.mark.parametrize("text", list(texts())[:50])
+def test_async_wrappers(text):
+    assert asyncio.run(escape_md(text)) == md_escaper(text)
+    assert asyncio.run(escape_html(text)) == html_escaper(text)
+
+
+def test_same_output_as_per_character_escaping():
+    for text in texts():
+        assert md_escaper(text) == per_char_backslash(r"\_*[]()#<>`+-|{}.!", text)
+        assert md_v2_escaper(text) == per_char_backslash(r"_*[]()~`>#+-=|{}.!", text)
+        assert escape_md_v2(text) == escape_string(text) == md_v2_escaper(text)
+        assert html_escaper(text) == per_char_html(text)
+
+
+def test_bulk():
+    rows = ["a.b", "<i>", "plain"]
+    assert md_v2_escaper.many(rows) == ["a\\.b", "<i\\>", "plain"]
+    assert html_escaper.many(rows) == ["a.b", "&lt;i&gt;", "plain"]
+    assert md_v2_escaper.mapping({"name": "x_y", "count": 3}) == {"name": "x\\_y", "count": 3}
+
+
+def test_non_str_md_v2():
+    assert escape_md_v2(1.5) == "1\\.5"
@@ -0,0 +1,63 @@
+"""
+Regression cases for `split_formatted`: every chunk must parse on its own.
+
+The inputs are valid MarkdownV2 (per `validate_md_v2`) that used to yield
+chunks Telegram rejects: markers closing an outer entity of the same type,
+literal backticks running into a reopened pre closer, and expandable
+quotes split across chunks.
+"""
+
+import pytest
+from aiogram.enums.parse_mode import ParseMode
+
+from aiogram_toolkit.md.split import split_formatted
+from aiogram_toolkit.md.validate import validate_md_v2
+
+CASES = [
+    ("*bold _italic *nested bold* italic_ bold*", 12),
+    ("_a __b _c_ d__ e_", 16),
+    ("___abc_ def__ ___g_ h__", 11),
+    ("**>\\.\\.||", 8),
+    ("**>\\.x y||", 8),
+    ("````||`_```", 8),
+    ("**>abcabc||", 8),
+    ("__x y\n>\\.__\n", 8),
+    ("**>____x y||", 8),
+    ("```~`*x y```", 8),
+    ("```~``___>```", 8),
+    ("````__`*_~```", 8),
+    ("abc\n**>||||||", 12),
+    ("```>`__`\n*```", 8),
+    ("**>`>x y```||", 8),
+    ("**>ab cd ef||", 8),
+    ("**>~abcx y~||", 8),
+    ("x y````~`>```", 12),
+    ("**>x yx yx y||", 8),
+    ("```*`>*_```x y", 8),
+    ("**>\\.`x y```||", 8),
+    ("\\.x y````abc_```", 12),
+    ("**>x y\\.x yx y||", 8),
+    ("```abc`____||```", 8),
+    ("**>abcab cd ef||", 8),
+    ("x y`___`*\n**>*||", 12),
+    ("**>`___`x y\\.||\n", 8),
+    ("```_\\.___`abc```", 8),
+    ("**>_\\._ab cd ef||", 8),
+    ("x y```~`~**>>*```", 8),
+    ("**>~\\.~ab cd ef||", 8),
+    ("```__||\n`x y>*```", 8),
+    ("\n**>ab cd efx y||", 8),
+    ("**>ab cd ef_x y||\n_", 12),
+    ("**>`abc\nabc`||\n`ab cd ef*`\\.", 8),
+    ("**>`[l](http://a)>\n\n\n`x yx y||", 20),
+    ("**>ab cd ef||[l](http://a)\n||", 20),
+    ("||\\.abc\\.\n>x y\n>||", 8),
+]
+
+
+@pytest.mark.parametrize(("text", "max_len"), CASES)
+def test_chunks_parse(text: str, max_len: int) -> None:
+    assert validate_md_v2(text) is None
+    for chunk in split_formatted(text, ParseMode.MARKDOWN_V2, max_len):
+        assert len(chunk) <= max_len
+        assert validate_md_v2(chunk) is None, chunk
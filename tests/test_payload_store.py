@@ -0,0 +1,62 @@
+"""Payload-store references: /start-safe deeplinks and non-blocking SQLite storage."""
+
+import asyncio
+import re
+
+import pytest
+
+from aiogram_toolkit.deeplink_callback import SQLitePayloadStore, set_bot_username, set_payload_store
+from aiogram_toolkit.deeplink_callback.base import BaseCB
+
+
+class SafeCB(BaseCB, prefix="safe", sep="-"):
+    text: str
+
+
+class ColonCB(BaseCB, prefix="colon"):
+    text: str
+
+
+@pytest.fixture
+def store(tmp_path):
+    set_bot_username("bot")
+    store = SQLitePayloadStore(str(tmp_path / "payloads.sqlite"))
+    set_payload_store(store)
+    yield store
+    set_payload_store(None)
+    store.close()
+
+
+def test_reference_is_start_safe(store):
+    link = SafeCB(text="x" * 100).deeplink()
+    start = link.split("?start=")[1]
+    assert re.fullmatch(r"[A-Za-z0-9_-]{1,64}", start)
+    assert SafeCB.unpack(start).text == "x" * 100
+
+
+def test_unsafe_separator_is_refused(store):
+    with pytest.raises(ValueError):
+        ColonCB(text="x" * 100).deeplink()
+    assert ColonCB(text="short").deeplink().endswith("?start=colon:short")
+
+
+def test_writes_and_reads_leave_the_loop(tmp_path, store):
+    async def write():
+        packed = SafeCB(text="y" * 100).pack()
+        assert len(store._writing) == 1  # written in a thread
+        await store.aclose()
+        return packed
+
+    packed = asyncio.run(write())
+
+    async def read():
+        reopened = SQLitePayloadStore(str(tmp_path / "payloads.sqlite"))
+        set_payload_store(reopened)
+        await reopened.load(SafeCB._reference_token(packed))
+        assert reopened._cache.get(SafeCB._reference_token(packed)) == "safe-" + "y" * 100
+        try:
+            return SafeCB.unpack(packed).text
+        finally:
+            await reopened.aclose()
+
+    assert asyncio.run(read()) == "y" * 100
@@ -0,0 +1,91 @@
+"""`QueryCache` keys and single-flight loads under invalidation."""
+
+import asyncio
+from enum import Enum
+
+import pytest
+
+from aiogram_toolkit.sqla.async_.cache import QueryCache
+
+
+class Color(Enum):
+    RED = 1
+
+
+class Plain:
+    pass
+
+
+def f():
+    pass
+
+
+def test_key_is_stable_and_typed():
+    key = QueryCache.key
+    assert key(f, (1, "a", Color.RED), {"b": (2, None)}) == key(f, (1, "a", Color.RED), {"b": (2, None)})
+    assert key(f, (frozenset("abc"),), {}) == key(f, (frozenset("cba"),), {})
+    assert key(f, (1,), {}) != key(f, (1.0,), {})
+    assert key(f, (1,), {}) != key(f, (True,), {})
+    assert key(f, (), {"a": 1, "b": 2}) == key(f, (), {"b": 2, "a": 1})
+
+
+def test_key_rejects_unusable_arguments():
+    with pytest.raises(TypeError, match="key="):
+        QueryCache.key(f, ([1],), {})
+    with pytest.raises(TypeError, match="key="):
+        QueryCache.key(f, ((1, {}),), {})
+    with pytest.raises(TypeError, match="key="):
+        QueryCache.key(f, (Plain(),), {})
+
+
+def test_invalidate_drops_in_flight_load():
+    async def main():
+        cache = QueryCache()
+        db = {"value": "old"}
+        started = asyncio.Semaphore(0)
+        release = asyncio.Event()
+
+        async def load():
+            value = db["value"]
+            started.release()
+            await release.wait()
+            return value
+
+        first = asyncio.create_task(cache.get_or_load("k", load, ["t"]))
+        await started.acquire()
+        db["value"] = "new"
+        await cache.invalidate("t")
+        # joins no pre-write load
+        second = asyncio.create_task(cache.get_or_load("k", load, ["t"]))
+        await started.acquire()
+        release.set()
+        assert await first == "old"
+        assert await second == "new"
+        assert await cache.get_or_load("k", load, ["t"]) == "new"
+
+    asyncio.run(main())
+
+
+def test_invalidate_keeps_unrelated_in_flight_load():
+    async def main():
+        cache = QueryCache()
+        calls = []
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def load():
+            calls.append(1)
+            started.set()
+            await release.wait()
+            return len(calls)
+
+        first = asyncio.create_task(cache.get_or_load("k", load, ["a"]))
+        await started.wait()
+        await cache.invalidate("b")
+        second = asyncio.create_task(cache.get_or_load("k", load, ["a"]))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        release.set()
+        assert (await first, await second) == (1, 1)
+
+    asyncio.run(main())
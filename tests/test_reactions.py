@@ -0,0 +1,55 @@
+"""`ReactionDispatcher` keeps one call per message in flight; the latest reaction lands last."""
+
+import asyncio
+
+from aiogram_toolkit.emojis import Emoji
+from aiogram_toolkit.rate_limit import ChatRateLimiter
+from aiogram_toolkit.reactions import ReactionDispatcher
+
+
+class SlowBot:
+    """Applies reactions after a delay that shrinks with every call."""
+
+    def __init__(self) -> None:
+        self.applied = []
+        self.delays = [0.05, 0.0, 0.0]
+        self.concurrent = 0
+        self.max_concurrent = 0
+
+    async def set_message_reaction(self, chat_id, message_id, reaction, is_big):
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        await asyncio.sleep(self.delays.pop(0) if self.delays else 0)
+        self.applied.append([r.emoji for r in reaction])
+        self.concurrent -= 1
+
+
+def test_latest_reaction_lands_last():
+    async def main():
+        bot = SlowBot()
+        reactions = ReactionDispatcher(ChatRateLimiter(1000, 1000, 1000))
+        reactions.react(bot, 1, 10, Emoji.THUMBS_UP)
+        await asyncio.sleep(0.01)  # the first call is in flight
+        reactions.react(bot, 1, 10, Emoji.EYES)
+        reactions.react(bot, 1, 10, Emoji.FIRE)
+        await asyncio.sleep(0.1)
+        await reactions.close()
+        return bot
+
+    bot = asyncio.run(main())
+    assert bot.applied == [[Emoji.THUMBS_UP.value], [Emoji.FIRE.value]]
+    assert bot.max_concurrent == 1
+
+
+def test_close_waits_for_calls_in_flight():
+    async def main():
+        bot = SlowBot()
+        reactions = ReactionDispatcher(ChatRateLimiter(1000, 1000, 1000))
+        reactions.react(bot, 1, 10, Emoji.THUMBS_UP)
+        await asyncio.sleep(0.01)
+        reactions.react(bot, 1, 10, Emoji.FIRE)
+        await reactions.close()
+        return bot
+
+    bot = asyncio.run(main())
+    assert bot.applied == [[Emoji.THUMBS_UP.value], [Emoji.FIRE.value]]
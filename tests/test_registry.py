@@ -0,0 +1,41 @@
+"""`CallbackRegistry.needs_state` decides whether the middleware looks up the FSM state."""
+
+from enum import Enum
+
+from aiogram_toolkit.deeplink_callback import BaseCB, CallbackRegistry
+
+
+class Act(Enum):
+    OPEN = "open"
+    EDIT = "edit"
+    SAME = "same"
+
+
+class Doc(BaseCB, prefix="reg_doc"):
+    action: Act
+
+
+async def opened(event, cb, data):
+    return True
+
+
+async def edited(event, cb, data):
+    return True
+
+
+def test_needs_state():
+    registry = CallbackRegistry()
+    registry.register(Doc, Act.OPEN, opened)
+    registry.register(Doc, Act.EDIT, opened)
+    registry.register(Doc, Act.EDIT, edited, states=["Form:name"])
+    # the state-scoped trigger is the fallback itself: the state changes nothing
+    registry.register(Doc, Act.SAME, opened)
+    registry.register(Doc, Act.SAME, opened, states=["Form:name"])
+
+    assert registry.needs_state(Doc(action=Act.OPEN))  # not frozen yet
+    registry.freeze()
+    assert not registry.needs_state(Doc(action=Act.OPEN))
+    assert registry.needs_state(Doc(action=Act.EDIT))
+    assert not registry.needs_state(Doc(action=Act.SAME))
+    assert registry.resolve(Doc(action=Act.EDIT), "Form:name") is edited
+    assert registry.resolve(Doc(action=Act.EDIT), None) is opened
@@ -0,0 +1,133 @@
+"""
+Ambient sessions: nested `function_with_session` / `with_session` scopes
+share one session (and pool connection) per update.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from aiogram_toolkit.sqla.async_.with_session.ambient import sqlite_savepoints
+from aiogram_toolkit.sqla.async_.with_session.function import function_with_session
+from aiogram_toolkit.sqla.async_.with_session.handler import with_session
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class User(Base):
+    __tablename__ = "users"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+def _wal(dbapi_connection, connection_record):
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+
+def run(tmp_path, scenario):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+        sqlite_savepoints(engine)
+        # readers hold a transaction with SAVEPOINTs on; WAL lets writers commit meanwhile
+        event.listen(engine.sync_engine, "connect", _wal)
+        checkouts = []
+        event.listen(engine.sync_engine, "checkout", lambda *_: checkouts.append(1))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(User.__table__.insert(), [{"id": 1, "name": "ann"}])
+        checkouts.clear()
+        try:
+            return await scenario(async_sessionmaker(engine, expire_on_commit=True), checkouts)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_one_connection_per_update(tmp_path):
+    async def scenario(Session, checkouts):
+        @function_with_session(Session)
+        async def get_name(user_id, session):
+            return await session.scalar(select(User.name).where(User.id == user_id))
+
+        @function_with_session(Session, "write")
+        async def add(user_id, name, session):
+            session.add(User(id=user_id, name=name))
+            await session.flush()
+            return await get_name(user_id)
+
+        @function_with_session(Session, "write")
+        async def update(session):
+            await add(2, "bob")
+            await add(3, "cid")
+            return [await get_name(user_id) for user_id in (1, 2, 3)]
+
+        @with_session(Session)
+        async def handler(event, session):
+            return [await get_name(1), await get_name(1)]
+
+        assert await update() == ["ann", "bob", "cid"]
+        assert len(checkouts) == 1
+        checkouts.clear()
+        assert await handler(None) == ["ann", "ann"]
+        assert len(checkouts) == 1
+
+    run(tmp_path, scenario)
+
+
+def test_objects_survive_nested_write(tmp_path):
+    async def scenario(Session, checkouts):
+        @function_with_session(Session, "write")
+        async def add(user_id, name, session):
+            session.add(User(id=user_id, name=name))
+
+        @with_session(Session)
+        async def handler(event, session):
+            user = await session.get(User, 1)
+            await add(2, "bob")
+            return user.name
+
+        assert await handler(None) == "ann"
+
+        @function_with_session(Session)
+        async def count(session):
+            return len((await session.scalars(select(User))).all())
+
+        assert await count() == 2
+
+    run(tmp_path, scenario)
+
+
+def test_failed_nested_write_is_undone(tmp_path):
+    async def scenario(Session, checkouts):
+        @function_with_session(Session, "write")
+        async def add(user_id, name, session):
+            session.add(User(id=user_id, name=name))
+            await session.flush()
+            if user_id < 0:
+                raise ValueError(name)
+
+        @function_with_session(Session, "write")
+        async def update(session):
+            await add(2, "bob")
+            with pytest.raises(ValueError):
+                await add(-1, "bad")
+            await add(3, "cid")
+
+        @function_with_session(Session)
+        async def ids(session):
+            return list(await session.scalars(select(User.id).order_by(User.id)))
+
+        await update()
+        assert await ids() == [1, 2, 3]
+
+    run(tmp_path, scenario)